@@ -1,51 +1,106 @@
-from flask import Flask
+import click
+from flask import Flask, jsonify
 from my_project.controller.movie_controller import movie_bp
 from my_project.controller.actor_controller import actor_bp
 from my_project.controller.director_controller import director_bp
-from my_project.database import engine, Base
-
-app = Flask(__name__)
-Base.metadata.create_all(bind=engine)
-
-app.register_blueprint(movie_bp)
-app.register_blueprint(actor_bp)
-app.register_blueprint(director_bp)
-
-@app.route('/')
-def start():
-    return "started"
+from my_project.controller.stats_controller import stats_bp
+from my_project.controller.export_controller import export_bp
+from my_project.database import SessionLocal, init_app, init_db, pool_stats
+from my_project.cache import entity_cache
+from my_project.response_cache import response_cache
+from my_project.graph import actor_graph
+from my_project.similarity import similar_movies
+from my_project.service.stats_service import rebuild_stats
+from my_project.service.movie_service import rebuild_search_index
+from my_project.export import EXPORT_ENTITIES, EXPORT_FORMATS, iter_export
+from my_project import admission, instrumentation
+
+
+def create_app():
+    """Build the app without touching the database.
+
+    Connections are opened lazily by each worker, so this is safe to call in a pre-fork
+    server's master (``gunicorn -w 4 'app:create_app()'``). Create the schema once per
+    deploy with ``flask init-db``.
+    """
+    app = Flask(__name__)
+    init_app(app)
+    instrumentation.init_app(app)
+    # After instrumentation, so shed requests still show up in the request timings.
+    admission.init_app(app)
+
+    app.register_blueprint(movie_bp)
+    app.register_blueprint(actor_bp)
+    app.register_blueprint(director_bp)
+    app.register_blueprint(stats_bp)
+    app.register_blueprint(export_bp)
+
+    @app.route('/')
+    def start():
+        return "started"
+
+    @app.route('/cache/stats')
+    def cache_stats():
+        return jsonify(entity_cache.stats())
+
+    @app.route('/response-cache/stats')
+    def response_cache_stats():
+        return jsonify(response_cache.stats())
+
+    @app.route('/pool/stats')
+    def get_pool_stats():
+        return jsonify(pool_stats())
+
+    @app.route('/admission/stats')
+    def admission_stats():
+        return jsonify(admission.stats())
+
+    @app.route('/graph/stats')
+    def graph_stats():
+        return jsonify(actor_graph.stats())
+
+    @app.route('/similarity/stats')
+    def similarity_stats():
+        return jsonify(similar_movies.stats())
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create any missing tables."""
+        init_db()
+
+    @app.cli.command('rebuild-stats')
+    def rebuild_stats_command():
+        """Recompute the /stats summary tables from the catalog."""
+        db = SessionLocal()
+        try:
+            rebuild_stats(db)
+        finally:
+            db.close()
+
+    @app.cli.command('rebuild-search')
+    def rebuild_search_command():
+        """Add the search indexes to an existing database and index the movies already in it."""
+        db = SessionLocal()
+        try:
+            rebuild_search_index(db)
+        finally:
+            db.close()
+
+    @app.cli.command('export')
+    @click.argument('entity', type=click.Choice(EXPORT_ENTITIES))
+    @click.option('--format', 'export_format', type=click.Choice(list(EXPORT_FORMATS)), default='ndjson')
+    @click.option('--output', type=click.Path(dir_okay=False), required=True)
+    def export_command(entity, export_format, output):
+        """Dump a whole table, movies with their cast, directors and facts."""
+        with open(output, 'wb') as f:
+            for chunk in iter_export(entity, export_format):
+                f.write(chunk)
+
+    return app
+
+
+app = create_app()
 
 if __name__ == '__main__':
+    init_db()
     app.run(debug=True)
-
-
-
-
-
-
-# from flask import Flask
-# from my_project.database import init_db
-# from my_project.controller.actor_controller import actor_bp
-# from my_project.controller.movie_controller import movie_bp
-# from my_project.controller.director_controller import director_bp
-# from my_project.database import engine, Base
-
-
-
-# def create_app():
-#         app = Flask(__name__)
-#         app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///./test.db'
-
-
-#         app.register_blueprint(actor_bp)
-#         app.register_blueprint(movie_bp)
-#         app.register_blueprint(director_bp)
-
-
-#         return app
-
-
-# if __name__ == '__main__':
-#     app = create_app()
-#     init_db(app)
-#     app.run(debug=True)
\ No newline at end of file
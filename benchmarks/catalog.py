@@ -0,0 +1,148 @@
+"""Synthetic catalog generator.
+
+Fills every table in my_project.domain.models with deterministic data so benchmark runs
+are comparable between commits:
+
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.catalog --scale small
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench.db")
+
+from sqlalchemy import create_engine, insert
+
+from my_project.database import Base
+from my_project.domain.models import Movie, Actor, Director, MovieActor, MovieDirector, MovieFact
+
+SCALES = {
+    "tiny": 1_000,
+    "small": 10_000,
+    "medium": 100_000,
+    "large": 1_000_000,
+}
+
+FIRST_NAMES = ["Anna", "Oleh", "Maria", "Ivan", "Sofia", "Taras", "Olena", "Dmytro", "Kateryna", "Andrii",
+               "John", "Emma", "Liam", "Olivia", "Noah", "Ava", "Lucas", "Mia", "Hugo", "Chloe"]
+LAST_NAMES = ["Kovalenko", "Shevchenko", "Bondarenko", "Tkachenko", "Melnyk", "Kravchenko", "Smith",
+              "Johnson", "Brown", "Garcia", "Martin", "Bernard", "Rossi", "Muller", "Novak", "Silva"]
+NATIONALITIES = ["Ukrainian", "American", "British", "French", "Italian", "German", "Polish", "Spanish", None]
+WORDS = ["night", "river", "shadow", "city", "dream", "empire", "winter", "signal", "garden", "machine",
+         "storm", "letter", "island", "mirror", "road", "fire", "silence", "harbor", "star", "echo"]
+
+
+def _phrase(rng, length):
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+def _popularity_pick(rng, population):
+    # Skewed towards low ids so a few actors appear in many movies, like a real catalog.
+    if rng.random() < 0.3:
+        return min(int(rng.paretovariate(1.2)) - 1, population - 1)
+    return rng.randrange(population)
+
+
+def generate(engine, movies=SCALES["small"], seed=42, chunk_size=5_000, mean_cast=12, max_facts=4):
+    rng = random.Random(seed)
+    actors = max(movies // 2, 1)
+    directors = max(movies // 10, 1)
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    def insert_chunks(table, rows):
+        chunk = []
+        with engine.begin() as conn:
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    conn.execute(insert(table), chunk)
+                    chunk = []
+            if chunk:
+                conn.execute(insert(table), chunk)
+
+    insert_chunks(Director.__table__, (
+        {
+            "director_id": i,
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "nationality": rng.choice(NATIONALITIES),
+            "imdb_code": f"nm{1_000_000 + i}",
+        }
+        for i in range(1, directors + 1)
+    ))
+    insert_chunks(Actor.__table__, (
+        {
+            "actor_id": i,
+            "name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "birth_date": None,
+            "nationality": rng.choice(NATIONALITIES),
+            "bio": _phrase(rng, rng.randint(10, 60)),
+            "imdb_code": f"nm{5_000_000 + i}",
+        }
+        for i in range(1, actors + 1)
+    ))
+    insert_chunks(Movie.__table__, (
+        {
+            "movie_id": i,
+            # Numbered so titles stay unique per release year (uq_movies_title_release_year).
+            "title": f"{_phrase(rng, rng.randint(1, 4)).title()} {i}",
+            "release_year": rng.randint(1920, 2025),
+            "duration": rng.randint(70, 200),
+            "description": _phrase(rng, rng.randint(20, 120)),
+            "imdb_code": f"tt{1_000_000 + i}",
+            "rating": round(rng.uniform(1.0, 9.9), 1) if rng.random() < 0.9 else None,
+        }
+        for i in range(1, movies + 1)
+    ))
+
+    def cast_rows():
+        for movie_id in range(1, movies + 1):
+            size = max(1, min(int(rng.gauss(mean_cast, mean_cast / 3)), actors))
+            cast = set()
+            while len(cast) < size:
+                cast.add(_popularity_pick(rng, actors) + 1)
+            for order, actor_id in enumerate(cast, start=1):
+                yield {
+                    "movie_id": movie_id,
+                    "actor_id": actor_id,
+                    "character_name": rng.choice(FIRST_NAMES),
+                    "billing_order": order,
+                }
+
+    def crew_rows():
+        for movie_id in range(1, movies + 1):
+            count = 1 if rng.random() < 0.85 else 2
+            for director_id in {rng.randint(1, directors) for _ in range(count)}:
+                yield {"movie_id": movie_id, "director_id": director_id}
+
+    def fact_rows():
+        for movie_id in range(1, movies + 1):
+            for _ in range(rng.randint(0, max_facts)):
+                yield {"movie_id": movie_id, "fact_text": _phrase(rng, rng.randint(8, 30)), "source": "synthetic"}
+
+    insert_chunks(MovieActor.__table__, cast_rows())
+    insert_chunks(MovieDirector.__table__, crew_rows())
+    insert_chunks(MovieFact.__table__, fact_rows())
+
+    return {"movies": movies, "actors": actors, "directors": directors, "seed": seed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=os.environ["DATABASE_URL"])
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--movies", type=int, help="overrides --scale")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    summary = generate(create_engine(args.url), args.movies or SCALES[args.scale], args.seed)
+    print(f"Generated {summary} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
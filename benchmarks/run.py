@@ -0,0 +1,228 @@
+"""Benchmark harness for every blueprint endpoint and the main DAO/service functions.
+
+    python -m benchmarks.run --scale small --iterations 200 --output bench.json
+    python -m benchmarks.run --reuse --compare bench.json
+
+Latency percentiles and throughput come from sequential calls, query counts from the
+per-request SQL instrumentation, and peak memory from one extra tracemalloc-traced call.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from itertools import count
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///bench.db")
+
+from flask import g
+
+from benchmarks.catalog import SCALES, generate
+from my_project.database import QueryStats, SessionLocal, get_engine
+from my_project.dao import movie_dao, actor_dao, director_dao, search_dao
+from my_project.pagination import PageRequest, encode_cursor
+from my_project.service import movie_service
+
+QUERY_COUNT = re.compile(r'desc="(\d+) queries"')
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(q / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def measure(call, iterations, warmup):
+    for _ in range(warmup):
+        call()
+
+    latencies, queries, errors = [], [], 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        ok, query_count = call()
+        latencies.append(time.perf_counter() - call_started)
+        queries.append(query_count)
+        errors += 0 if ok else 1
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "throughput_rps": round(iterations / elapsed, 1) if elapsed else None,
+        "queries_per_call": round(sum(queries) / len(queries), 2),
+        "max_queries": max(queries),
+        "peak_memory_kb": round(peak / 1024, 1),
+        "errors": errors,
+    }
+
+
+def http_call(client, method, url_factory, json_factory=None):
+    def call():
+        response = client.open(url_factory(), method=method, json=json_factory() if json_factory else None)
+        response.get_data()
+        match = QUERY_COUNT.search(response.headers.get("Server-Timing", ""))
+        return response.status_code < 400, int(match.group(1)) if match else 0
+    return call
+
+
+def direct_call(app, function):
+    def call():
+        with app.app_context():
+            g.query_stats = QueryStats()
+            db = SessionLocal()
+            try:
+                function(db)
+            finally:
+                db.close()
+            return True, g.query_stats.count
+    return call
+
+
+def endpoint_cases(client, movies, actors, directors):
+    movie_id, actor_id, director_id = movies // 2, actors // 2, directors // 2
+    deep_cursor = encode_cursor("movie_id", False, None, int(movies * 0.9))
+    serial = count()
+    batch_ids = list(range(movie_id, movie_id + 50))
+
+    def new_movie():
+        n = next(serial)
+        return {"title": f"Benchmark {n}", "release_year": 3000 + n % 1000, "duration": 100,
+                "imdb_code": f"bench{time.time_ns()}{n}", "rating": 5.0}
+
+    get = lambda url: http_call(client, "GET", lambda: url)
+    return {
+        "GET /movies/": get("/movies/"),
+        "GET /movies/ (deep page)": get(f"/movies/?cursor={deep_cursor}"),
+        "GET /movies/?sort=rating": get("/movies/?sort=rating&order=desc"),
+        "GET /movies/?stream=ndjson": get("/movies/?stream=ndjson&limit=1000"),
+        "GET /movies/?fields=title,rating": get("/movies/?fields=title,rating"),
+        "GET /movies/<id>": get(f"/movies/{movie_id}"),
+        "GET /movies/<id>?include=actors,directors,facts": get(f"/movies/{movie_id}?include=actors,directors,facts"),
+        "GET /movies/?include=actors,directors,facts": get("/movies/?include=actors,directors,facts"),
+        "GET /movies/?ids= (50, with actors)": get(f"/movies/?ids={','.join(map(str, batch_ids))}&include=actors"),
+        "POST /movies/batch-get (50)": http_call(client, "POST", lambda: "/movies/batch-get", lambda: {"ids": batch_ids}),
+        "GET /movies/<id>/actors": get(f"/movies/{movie_id}/actors"),
+        "GET /movies/<id>/directors": get(f"/movies/{movie_id}/directors"),
+        "GET /movies/<id>/similar": get(f"/movies/{movie_id}/similar?k=20"),
+        "GET /movies/search": get("/movies/search?q=river+shadow"),
+        "GET /movies/movies-grouped-details": get("/movies/movies-grouped-details"),
+        "GET /movies/movies-with-facts": get("/movies/movies-with-facts"),
+        "GET /movies/movies-facts-grouped": get("/movies/movies-facts-grouped"),
+        "GET /movies/movies-facts-list": get("/movies/movies-facts-list"),
+        "POST /movies/": http_call(client, "POST", lambda: "/movies/", new_movie),
+        "PUT /movies/<id>": http_call(client, "PUT", lambda: f"/movies/{movie_id}", lambda: {"duration": 120}),
+        "GET /actors/": get("/actors/"),
+        "GET /actors/<id>": get(f"/actors/{actor_id}"),
+        "GET /actors/<id>/movies": get(f"/actors/{actor_id}/movies"),
+        "GET /actors/<a>/path/<b>": get(f"/actors/{actor_id}/path/{actors}"),
+        "GET /actors/<id>/costars?hops=2": get(f"/actors/{actor_id}/costars?hops=2"),
+        "GET /directors": get("/directors"),
+        "GET /directors/<id>": get(f"/directors/{director_id}"),
+        "GET /directors/<id>/movies": get(f"/directors/{director_id}/movies"),
+    }
+
+
+def direct_cases(app, movies):
+    movie_id = movies // 2
+    page = PageRequest(100, None, "movie_id", False)
+    return {
+        "movie_dao.get_movie_by_id": direct_call(app, lambda db: movie_dao.get_movie_by_id(db, movie_id)),
+        "movie_dao.get_all_movies": direct_call(app, lambda db: movie_dao.get_all_movies(db, page)),
+        "movie_dao.get_all_movies (grouped_details)": direct_call(
+            app, lambda db: [m.directors for m in movie_dao.get_all_movies(db, page, "grouped_details").items]
+        ),
+        "movie_dao.movie_dao_get_movies_with_facts": direct_call(
+            app, lambda db: movie_dao.movie_dao_get_movies_with_facts(db, page)
+        ),
+        "movie_service.get_movie_by_id (detail)": direct_call(
+            app, lambda db: movie_service.get_movie_by_id(db, movie_id, "detail").directors
+        ),
+        "search_dao.search_movies": direct_call(app, lambda db: search_dao.search_movies(db, "river shadow", 100)),
+        "actor_dao.get_all_actors": direct_call(app, lambda db: actor_dao.get_all_actors(db)),
+        "director_dao.get_all_directors": direct_call(app, lambda db: director_dao.get_all_directors(db)),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    print(f"{'benchmark':55} {'p95 before':>11} {'p95 now':>9} {'change':>8}")
+    for name, result in current.items():
+        before = baseline.get(name)
+        if not before or not before["p95_ms"]:
+            continue
+        change = (result["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        print(f"{name:55} {before['p95_ms']:>11.2f} {result['p95_ms']:>9.2f} {change:>+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--movies", type=int, help="overrides --scale")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reuse", action="store_true", help="benchmark the existing database as-is")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--only", help="regex selecting benchmark names")
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--compare", help="earlier output file to compare p95 latencies against")
+    args = parser.parse_args()
+
+    movies = args.movies or SCALES[args.scale]
+    engine = get_engine()
+    if not args.reuse:
+        generate(engine, movies, args.seed)
+    actors, directors = max(movies // 2, 1), max(movies // 10, 1)
+
+    from app import app
+    client = app.test_client()
+    cases = {**endpoint_cases(client, movies, actors, directors), **direct_cases(app, movies)}
+    if args.only:
+        cases = {name: case for name, case in cases.items() if re.search(args.only, name)}
+
+    results = {}
+    for name, case in cases.items():
+        results[name] = measure(case, args.iterations, args.warmup)
+        print(f"{name:55} p50 {results[name]['p50_ms']:8.2f}ms  p99 {results[name]['p99_ms']:8.2f}ms  "
+              f"{results[name]['queries_per_call']:6.1f} queries")
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "database": engine.dialect.name,
+        "catalog": {"movies": movies, "actors": actors, "directors": directors, "seed": args.seed},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output} ({engine.url.render_as_string(hide_password=True)})")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
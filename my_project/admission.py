@@ -0,0 +1,147 @@
+"""Per-endpoint admission control.
+
+Every request takes a slot from its endpoint's budget before the view runs. When all
+slots are taken it waits in a bounded queue for at most ``queue_timeout_seconds``, and
+is turned away with 503 + Retry-After when the queue is full or the wait runs out.
+Expensive endpoints get budgets of their own, so a slow database backs them up without
+using up the threads that cheap lookups need. Limits apply per process.
+"""
+import threading
+import time
+
+from flask import g, jsonify, request
+
+from my_project.config import get_section
+from my_project.metrics import Counter, Gauge, Histogram, registry
+
+settings = get_section('admission', {
+    'enabled': True,
+    'retry_after_seconds': 1,
+    'budgets': {
+        'default': {'concurrency': 24, 'max_queue': 48, 'queue_timeout_seconds': 1.0},
+        'reports': {'concurrency': 4, 'max_queue': 8, 'queue_timeout_seconds': 2.0},
+        'exports': {'concurrency': 2, 'max_queue': 0, 'queue_timeout_seconds': 0},
+    },
+    # Endpoint ("blueprint.view") or blueprint name -> budget; anything else uses 'default'.
+    'endpoints': {
+        'movies.get_movies_grouped_details_endpoint': 'reports',
+        'movies.get_movies_with_facts_endpoint': 'reports',
+        'movies.get_movies_facts_grouped_endpoint': 'reports',
+        'movies.get_movies_facts_list_endpoint': 'reports',
+        'export': 'exports',
+    },
+    # Never limited, so health checks and scrapes keep answering under overload.
+    'exempt': ['metrics', 'start', 'get_pool_stats', 'admission_stats'],
+})
+
+queue_depth = registry.register(Gauge(
+    "admission_queue_depth", "Requests waiting for a slot in their budget.", ("budget",)
+))
+in_flight = registry.register(Gauge(
+    "admission_in_flight", "Requests holding a slot in their budget.", ("budget",)
+))
+queue_wait = registry.register(Histogram(
+    "admission_queue_wait_seconds", "Time admitted requests spent waiting for a slot.", ("budget",)
+))
+shed = registry.register(Counter(
+    "admission_shed_total", "Requests rejected with 503 instead of being queued or served.", ("budget", "reason")
+))
+
+
+class Budget:
+    def __init__(self, name, concurrency, max_queue, queue_timeout_seconds):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout_seconds
+        self.active = 0
+        self.waiting = 0
+        self._slots = threading.Condition()
+
+    def acquire(self):
+        """None once a slot is held, otherwise why the request was shed."""
+        with self._slots:
+            if self.active < self.concurrency and not self.waiting:
+                self._enter()
+                return None
+            if self.waiting >= self.max_queue:
+                return "queue_full"
+
+            started = time.monotonic()
+            deadline = started + self.queue_timeout
+            self.waiting += 1
+            queue_depth.set(self.waiting, self.name)
+            try:
+                while self.active >= self.concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return "timeout"
+                    self._slots.wait(remaining)
+            finally:
+                self.waiting -= 1
+                queue_depth.set(self.waiting, self.name)
+            queue_wait.observe(time.monotonic() - started, self.name)
+            self._enter()
+            return None
+
+    def _enter(self):
+        self.active += 1
+        in_flight.set(self.active, self.name)
+
+    def release(self):
+        with self._slots:
+            self.active -= 1
+            in_flight.set(self.active, self.name)
+            self._slots.notify()
+
+
+budgets = {name: Budget(name, **limits) for name, limits in settings['budgets'].items()}
+
+
+def budget_for(endpoint):
+    if endpoint is None or endpoint in settings['exempt']:
+        return None
+    name = settings['endpoints'].get(endpoint)
+    if name is None and '.' in endpoint:
+        name = settings['endpoints'].get(endpoint.split('.', 1)[0])
+    return budgets[name or 'default']
+
+
+def _admit():
+    budget = budget_for(request.endpoint)
+    if budget is None:
+        return None
+    reason = budget.acquire()
+    if reason is not None:
+        shed.inc(budget.name, reason)
+        response = jsonify({"error": "Server is busy, retry later"})
+        response.headers['Retry-After'] = str(settings['retry_after_seconds'])
+        return response, 503
+    g.admission_budget = budget
+    return None
+
+
+def _release(exception=None):
+    # Teardown runs once the response, streamed ones included, has been sent.
+    budget = g.pop('admission_budget', None)
+    if budget is not None:
+        budget.release()
+
+
+def stats():
+    return {
+        name: {
+            "concurrency": budget.concurrency,
+            "max_queue": budget.max_queue,
+            "active": budget.active,
+            "waiting": budget.waiting,
+        }
+        for name, budget in budgets.items()
+    }
+
+
+def init_app(app):
+    if not settings['enabled']:
+        return
+    app.before_request(_admit)
+    app.teardown_request(_release)
@@ -0,0 +1,119 @@
+import json
+from itertools import islice
+from typing import List
+
+from pydantic import TypeAdapter, ValidationError
+
+from my_project.config import get_section
+
+settings = get_section('bulk_import', {
+    'chunk_size': 1000,
+})
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+
+class BulkImportException(Exception):
+    pass
+
+
+def iter_records(request):
+    """Yield (row, record, error) for a JSON array body or an NDJSON stream."""
+    if request.mimetype in NDJSON_MIMETYPES:
+        return _iter_ndjson(request.stream)
+
+    records = request.get_json(silent=True)
+    if not isinstance(records, list):
+        raise BulkImportException("Expected a JSON array or an NDJSON body")
+    return ((row, record, None) for row, record in enumerate(records))
+
+
+def _iter_ndjson(stream):
+    row = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield row, json.loads(line), None
+        except ValueError:
+            yield row, None, "Invalid JSON"
+        row += 1
+
+
+def chunked(iterable, size: int):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _row_errors(error: ValidationError):
+    return error.errors(include_url=False, include_context=False, include_input=False)
+
+
+def validate_chunk(adapter: TypeAdapter, chunk):
+    """Validate a whole chunk in one pydantic call, falling back to the failing rows only."""
+    report = []
+    candidates = []
+    for row, record, error in chunk:
+        if error is not None:
+            report.append({"row": row, "status": "invalid", "errors": error})
+        else:
+            candidates.append((row, record))
+
+    try:
+        models = adapter.validate_python([record for _, record in candidates])
+        return list(zip((row for row, _ in candidates), models)), report
+    except ValidationError as e:
+        failed = {}
+        for item in _row_errors(e):
+            failed.setdefault(item['loc'][0], []).append({**item, 'loc': list(item['loc'][1:])})
+
+    for position in sorted(failed):
+        report.append({"row": candidates[position][0], "status": "invalid", "errors": failed[position]})
+    remaining = [pair for position, pair in enumerate(candidates) if position not in failed]
+    models = adapter.validate_python([record for _, record in remaining])
+    return list(zip((row for row, _ in remaining), models)), report
+
+
+def import_records(db, records, schema, keys_of, find_existing, insert_rows, chunk_size=None):
+    """Validate, de-duplicate and insert records chunk by chunk.
+
+    keys_of(model) returns the natural keys of a row, find_existing(db, models) returns the
+    subset of those keys already stored, and insert_rows(db, models) inserts the rows and
+    returns their new primary keys in order.
+    """
+    adapter = TypeAdapter(List[schema])
+    report = []
+    seen = set()
+
+    for chunk in chunked(records, chunk_size or settings['chunk_size']):
+        valid, chunk_report = validate_chunk(adapter, chunk)
+        existing = find_existing(db, [model for _, model in valid]) if valid else set()
+
+        to_insert = []
+        for row, model in valid:
+            keys = keys_of(model)
+            if any(key in existing or key in seen for key in keys):
+                chunk_report.append({"row": row, "status": "duplicate"})
+                continue
+            seen.update(keys)
+            to_insert.append((row, model))
+
+        new_ids = insert_rows(db, [model for _, model in to_insert]) if to_insert else []
+        for (row, _), new_id in zip(to_insert, new_ids):
+            chunk_report.append({"row": row, "status": "created", "id": new_id})
+
+        report.extend(sorted(chunk_report, key=lambda item: item["row"]))
+
+    return report
+
+
+def summarize(report):
+    counts = {"created": 0, "duplicate": 0, "invalid": 0}
+    for item in report:
+        counts[item["status"]] += 1
+    return {**counts, "results": report}
@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+
+from my_project.config import get_section
+from my_project.table_versions import table_versions
+
+settings = get_section('cache', {
+    'enabled': True,
+    'max_entries': 10000,
+    'ttl_seconds': 300,
+})
+
+_MISSING = object()
+
+# The tables each namespace's cached bodies are built from. A write to any of them, in any
+# worker, retires the entries built before it.
+NAMESPACE_TABLES = {
+    "movie": ("movies", "movie_directors", "directors"),
+    "actor": ("actors",),
+    "director": ("directors",),
+}
+
+
+class LRUCache:
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return _MISSING
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl_seconds)
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class EntityCache:
+    def __init__(self, local: LRUCache, enabled=True):
+        self.local = local
+        self.enabled = enabled
+
+    @staticmethod
+    def _key(namespace, entity_id):
+        return f"{namespace}:{entity_id}"
+
+    def get_or_load(self, namespace, entity_id, loader):
+        if not self.enabled:
+            return loader()
+
+        # Read before loading, so a write committed mid-load leaves the entry already outdated.
+        versions = table_versions.current(NAMESPACE_TABLES[namespace])
+        if versions is None:
+            return loader()
+
+        key = self._key(namespace, entity_id)
+        entry = self.local.get(key)
+        if entry is not _MISSING and entry["versions"] == versions:
+            return entry["value"]
+
+        value = loader()
+        self.local.set(key, {"versions": versions, "value": value})
+        return value
+
+    def invalidate(self, namespace, entity_id):
+        self.local.delete(self._key(namespace, entity_id))
+
+    def stats(self):
+        return {"enabled": self.enabled, **self.local.stats()}
+
+
+entity_cache = EntityCache(
+    LRUCache(settings['max_entries'], settings['ttl_seconds']),
+    enabled=settings['enabled'],
+)
+
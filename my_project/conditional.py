@@ -0,0 +1,108 @@
+import hashlib
+from datetime import datetime, timezone
+from http import HTTPStatus
+from typing import NamedTuple, Optional
+
+from flask import request
+from werkzeug.http import http_date, quote_etag
+
+from my_project.cache import entity_cache
+
+
+class PreconditionFailedException(Exception):
+    pass
+
+
+class Version(NamedTuple):
+    etag: str
+    last_modified: Optional[datetime]
+    row_version: Optional[int] = None
+
+
+def make_version(namespace: str, parts, last_modified, row_version=None):
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return Version(f"{namespace}-{digest}", last_modified, row_version)
+
+
+def page_version(namespace: str, page, pk_key: str):
+    """Validators for a page of rows or entities that carry ``version`` and ``updated_at``."""
+    parts = [(getattr(item, pk_key), item.version) for item in page.items]
+    last_modified = max((item.updated_at for item in page.items), default=None)
+    return make_version(namespace, (parts, page.next_cursor), last_modified)
+
+
+def content_version(base: Version, content):
+    """Validators for ``base``'s representation extended with ``content`` it does not itself version.
+
+    The ETag covers the extra content; Last-Modified is dropped since it no longer bounds it.
+    """
+    return make_version(base.etag, content, None, base.row_version)
+
+
+def is_conditional():
+    return bool(request.if_none_match) or request.if_modified_since is not None
+
+
+def _to_http_precision(value: datetime):
+    # updated_at is stored as naive UTC; HTTP dates carry whole seconds only.
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def not_modified(version: Optional[Version]):
+    if version is None:
+        return False
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(version.etag)
+    since = request.if_modified_since
+    return since is not None and version.last_modified is not None and _to_http_precision(version.last_modified) <= since
+
+
+def validator_headers(version: Optional[Version]):
+    if version is None:
+        return {}
+    headers = {'ETag': quote_etag(version.etag)}
+    if version.last_modified is not None:
+        headers['Last-Modified'] = http_date(_to_http_precision(version.last_modified))
+    return headers
+
+
+def not_modified_response(version: Version):
+    return "", HTTPStatus.NOT_MODIFIED, validator_headers(version)
+
+
+def if_match_version(load_version):
+    """Row version an If-Match request pins the update to, or None when it sent no If-Match.
+
+    ``load_version`` runs only for If-Match requests; a missing row is left to the caller's lookup.
+    """
+    if not request.if_match:
+        return None
+    version = load_version()
+    if version is None:
+        return None
+    if not request.if_match.contains(version.etag):
+        raise PreconditionFailedException("Resource was modified since it was fetched")
+    return version.row_version
+
+
+def check_row_version(current: int, expected: Optional[int]):
+    if expected is not None and current != expected:
+        raise PreconditionFailedException("Resource was modified since it was fetched")
+
+
+def cached_representation(namespace: str, entity_id, loader, version: Optional[Version] = None):
+    """Serve the cached body together with the validators of the row it was built from.
+
+    ``loader`` returns ``(version, body)``. When the caller already knows the current
+    version, a cached body built from an older row is dropped and rebuilt, so a client
+    is never handed a stale body under a fresh ETag.
+    """
+    def load():
+        loaded_version, body = loader()
+        return {"version": loaded_version, "body": body}
+
+    cached = entity_cache.get_or_load(namespace, entity_id, load)
+    if version is not None and cached["version"].etag != version.etag:
+        entity_cache.invalidate(namespace, entity_id)
+        cached = entity_cache.get_or_load(namespace, entity_id, load)
+    return cached["version"], cached["body"]
@@ -0,0 +1,12 @@
+import yaml
+
+CONFIG_PATH = 'config/app.yml'
+
+with open(CONFIG_PATH, 'r') as f:
+    app_config = yaml.safe_load(f) or {}
+
+
+def get_section(name: str, defaults: dict = None):
+    section = dict(defaults or {})
+    section.update(app_config.get(name) or {})
+    return section
@@ -1,31 +1,42 @@
 from flask import Blueprint, request, jsonify
 from sqlalchemy.orm import Session
 from pydantic import ValidationError
-from my_project.database import get_db
+from my_project.database import primary_reads, with_db_session
 from my_project.service.actor_service import (
     create_new_actor,
-    get_all_actors_service,
     get_actor_by_id,
     update_existing_actor,
     delete_existing_actor,
     get_actor_movies_service,
+    bulk_create_actors,
+    get_actor_by_imdb_code,
+    resolve_actor_imdb_codes,
+    get_actor_version,
+    get_actors_page_version,
+    get_all_actor_rows_service,
+    get_actor_path_service,
+    get_costars_service,
+    iter_all_actor_rows,
+    get_actors_batch,
     ActorNotFoundException,
     ActorAlreadyExistsException
 )
-from my_project.domain.schemas import ActorCreate, ActorUpdate, ActorResponse, MovieResponse
+from my_project.dao.actor_dao import ACTOR_INCLUDES, ACTOR_SORT_COLUMNS, actor_version
+from my_project.conditional import (
+    PreconditionFailedException, cached_representation, if_match_version, is_conditional,
+    not_modified, not_modified_response, page_version, validator_headers
+)
+from my_project.pagination import PaginationException, read_page_args, page_headers, clamp_limit
+from my_project.bulk_import import BulkImportException, iter_records, summarize
+from my_project.streaming import StreamingException, read_stream_format, streaming_response
+from my_project.lookups import LookupRequestException, batch_body, read_id_args, read_id_payload, read_imdb_codes
+from my_project.domain.schemas import ActorCreate, ActorUpdate, ActorResponse, MovieResponse, actor_serializer, movie_serializer
+from my_project.graph import GraphNotReadyException, settings as graph_settings
+from my_project.serialization import json_response
+from my_project.fieldsets import FieldsetException, read_fields
 
 actor_bp = Blueprint('actors', __name__, url_prefix='/actors')
 
-def with_db_session(f):
-    def wrapper(*args, **kwargs):
-        db = next(get_db())
-        try:
-            return f(db, *args, **kwargs)
-        finally:
-            db.close()
-    wrapper.__name__ = f.__name__
-    return wrapper
-
 @actor_bp.route('/', methods=['POST'])
 @with_db_session
 def create_actor_endpoint(db: Session):
@@ -40,22 +51,105 @@ def create_actor_endpoint(db: Session):
     except ActorAlreadyExistsException as e:
         return jsonify({"error": str(e)}), 409
 
+@actor_bp.route('/bulk', methods=['POST'])
+@with_db_session
+def bulk_create_actors_endpoint(db: Session):
+    try:
+        report = bulk_create_actors(db, iter_records(request))
+    except BulkImportException as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(summarize(report)), 200
+
+def _batch_actors_response(db, actor_ids, include):
+    items, not_found = get_actors_batch(db, actor_ids, include)
+
+    def to_dict(actor):
+        actor_dict = actor_serializer.to_dict(actor)
+        if "movies" in include:
+            actor_dict["movies"] = [{"movie_id": m.movie_id, **movie_serializer.to_dict(m)} for m in actor.movies]
+        return actor_dict
+
+    return json_response(batch_body(items, not_found, to_dict), 200)
+
+@actor_bp.route('/batch-get', methods=['POST'])
+@with_db_session
+def batch_get_actors_endpoint(db: Session):
+    try:
+        actor_ids, include = read_id_payload(request.get_json(silent=True), ACTOR_INCLUDES)
+    except LookupRequestException as e:
+        return jsonify({"error": str(e)}), 400
+    return _batch_actors_response(db, actor_ids, include)
+
 @actor_bp.route('/', methods=['GET'])
 @with_db_session
 def get_actors_endpoint(db: Session):
-    actors = get_all_actors_service(db, skip=0, limit=100)
-    response_data = [ActorResponse.model_validate(a).model_dump() for a in actors]
-    return jsonify(response_data), 200
+    if 'ids' in request.args:
+        try:
+            actor_ids, include = read_id_args(request.args, ACTOR_INCLUDES)
+        except LookupRequestException as e:
+            return jsonify({"error": str(e)}), 400
+        return _batch_actors_response(db, actor_ids, include)
+    try:
+        fields = read_fields(request.args, actor_serializer)
+        serializer = actor_serializer.only(fields)
+        stream_format = read_stream_format(request.args)
+        if stream_format:
+            return streaming_response(
+                lambda session, chunk_size: iter_all_actor_rows(session, chunk_size, fields),
+                serializer.to_dict,
+                stream_format
+            )
+        page_request = read_page_args(request.args, ACTOR_SORT_COLUMNS, "actor_id")
+        if is_conditional():
+            version = get_actors_page_version(db, page_request)
+            if not_modified(version):
+                return not_modified_response(version)
+        page = get_all_actor_rows_service(db, page_request, fields)
+    except (PaginationException, StreamingException, FieldsetException) as e:
+        return jsonify({"error": str(e)}), 400
+    headers = {**page_headers(page), **validator_headers(page_version("actors", page, "actor_id"))}
+    return json_response(serializer.many(page.items), 200, headers)
 
 @actor_bp.route('/<int:actor_id>', methods=['GET'])
 @with_db_session
 def get_actor_endpoint(db: Session, actor_id: int):
+    version = None
+    if is_conditional():
+        version = get_actor_version(db, actor_id)
+        if version is None:
+            return jsonify({"error": "Actor not found"}), 404
+        if not_modified(version):
+            return not_modified_response(version)
+
+    def load_actor():
+        with primary_reads(db):
+            actor = get_actor_by_id(db, actor_id)
+        return actor_version(actor), ActorResponse.model_validate(actor).model_dump()
+
     try:
-        actor = get_actor_by_id(db, actor_id)
+        version, actor_data = cached_representation("actor", actor_id, load_actor, version)
+        return jsonify(actor_data), 200, validator_headers(version)
+    except ActorNotFoundException as e:
+        return jsonify({"error": str(e)}), 404
+
+@actor_bp.route('/by-imdb/<string:imdb_code>', methods=['GET'])
+@with_db_session
+def get_actor_by_imdb_endpoint(db: Session, imdb_code: str):
+    try:
+        actor = get_actor_by_imdb_code(db, imdb_code)
         return jsonify(ActorResponse.model_validate(actor).model_dump()), 200
     except ActorNotFoundException as e:
         return jsonify({"error": str(e)}), 404
 
+@actor_bp.route('/by-imdb', methods=['POST'])
+@with_db_session
+def resolve_actor_imdb_endpoint(db: Session):
+    try:
+        imdb_codes = read_imdb_codes(request.get_json(silent=True))
+    except LookupRequestException as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(resolve_actor_imdb_codes(db, imdb_codes)), 200
+
 @actor_bp.route('/<int:actor_id>', methods=['PUT'])
 @with_db_session
 def update_actor_endpoint(db: Session, actor_id: int):
@@ -65,26 +159,31 @@ def update_actor_endpoint(db: Session, actor_id: int):
         return jsonify({"error": e.errors()}), 400
     
     try:
-        updated_actor = update_existing_actor(db, actor_id, actor_update_schema)
-        return jsonify(ActorResponse.model_validate(updated_actor).model_dump()), 200
+        expected_version = if_match_version(lambda: get_actor_version(db, actor_id))
+        updated_actor = update_existing_actor(db, actor_id, actor_update_schema, expected_version)
+        return (
+            jsonify(ActorResponse.model_validate(updated_actor).model_dump()), 200,
+            validator_headers(actor_version(updated_actor))
+        )
     except ActorNotFoundException as e:
         return jsonify({"error": str(e)}), 404
+    except PreconditionFailedException as e:
+        return jsonify({"error": str(e)}), 412
     
 
 @actor_bp.route('/<int:actor_id>', methods=['PATCH'])
 @with_db_session
 def patch_actor_endpoint(db: Session, actor_id: int):
     data = request.json  
+    actor_update_schema = ActorUpdate(name=data["name"]) if "name" in data else ActorUpdate()
     try:
-        actor = get_actor_by_id(db, actor_id)
+        expected_version = if_match_version(lambda: get_actor_version(db, actor_id))
+        actor = update_existing_actor(db, actor_id, actor_update_schema, expected_version)
     except ActorNotFoundException as e:
         return jsonify({"error": str(e)}), 404
-    if "name" in data:
-        actor.name = data["name"]
-
-    db.commit()
-    db.refresh(actor)
-    return jsonify(ActorResponse.model_validate(actor).model_dump()), 200
+    except PreconditionFailedException as e:
+        return jsonify({"error": str(e)}), 412
+    return jsonify(ActorResponse.model_validate(actor).model_dump()), 200, validator_headers(actor_version(actor))
 
 
 @actor_bp.route('/<int:actor_id>', methods=['DELETE'])
@@ -108,3 +207,44 @@ def get_actor_movies_endpoint(db: Session, actor_id: int):
         return jsonify(movies_data), 200
     except ActorNotFoundException as e:
         return jsonify({"error": str(e)}), 404
+
+@actor_bp.route('/<int:source_id>/path/<int:target_id>', methods=['GET'])
+@with_db_session
+def get_actor_path_endpoint(db: Session, source_id: int, target_id: int):
+    try:
+        path = get_actor_path_service(db, source_id, target_id)
+    except ActorNotFoundException as e:
+        return jsonify({"error": str(e)}), 404
+    except GraphNotReadyException as e:
+        return jsonify({"error": str(e)}), 503, {'Retry-After': '30'}
+    if path is None:
+        return jsonify({"error": f"No path within {graph_settings['max_degrees']} degrees"}), 404
+
+    actors, movies = path
+    return json_response({
+        "degrees": len(movies),
+        "actors": actor_serializer.many(actors),
+        "movies": [{"movie_id": m.movie_id, **movie_serializer.to_dict(m)} for m in movies],
+    }, 200)
+
+@actor_bp.route('/<int:actor_id>/costars', methods=['GET'])
+@with_db_session
+def get_actor_costars_endpoint(db: Session, actor_id: int):
+    hops = request.args.get('hops', 1, type=int)
+    if not 1 <= hops <= graph_settings['max_hops']:
+        return jsonify({"error": f"hops must be between 1 and {graph_settings['max_hops']}"}), 400
+
+    try:
+        distances = get_costars_service(db, actor_id, hops)
+    except ActorNotFoundException as e:
+        return jsonify({"error": str(e)}), 404
+    except GraphNotReadyException as e:
+        return jsonify({"error": str(e)}), 503, {'Retry-After': '30'}
+
+    nearest = sorted(distances.items(), key=lambda item: (item[1], item[0]))
+    costars = [
+        {"actor_id": costar_id, "hops": distance}
+        for costar_id, distance in nearest[:clamp_limit(request.args.get('limit', type=int))]
+    ]
+    return json_response({"actor_id": actor_id, "total": len(distances), "costars": costars}, 200)
+
@@ -4,66 +4,195 @@ from http import HTTPStatus
 from sqlalchemy.orm import Session
 from my_project.domain.models import Director
 from my_project.service import director_service
-from my_project.domain.schemas import DirectorCreate, DirectorUpdate, DirectorResponse, MovieResponse
+from my_project.domain.schemas import DirectorCreate, DirectorUpdate, DirectorResponse, MovieResponse, director_serializer, movie_serializer
+from my_project.serialization import json_response
+from my_project.fieldsets import FieldsetException, read_fields
 from pydantic import ValidationError
-from my_project.database import get_db
+from my_project.database import primary_reads, with_db_session
+from my_project.dao.director_dao import DIRECTOR_INCLUDES, DIRECTOR_SORT_COLUMNS, director_version
+from my_project.conditional import (
+    PreconditionFailedException, cached_representation, if_match_version, is_conditional,
+    not_modified, not_modified_response, page_version, validator_headers
+)
+from my_project.pagination import PaginationException, read_page_args, page_headers
+from my_project.bulk_import import BulkImportException, iter_records, summarize
+from my_project.streaming import StreamingException, read_stream_format, streaming_response
+from my_project.lookups import LookupRequestException, batch_body, read_id_args, read_id_payload, read_imdb_codes
 
 director_bp = Blueprint('directors', __name__, url_prefix='/directors')
 
+def _batch_directors_response(db, director_ids, include):
+    items, not_found = director_service.get_directors_batch(db, director_ids, include)
+
+    def to_dict(director):
+        director_dict = director_serializer.to_dict(director)
+        if "movies" in include:
+            director_dict["movies"] = [{"movie_id": m.movie_id, **movie_serializer.to_dict(m)} for m in director.movies]
+        return director_dict
+
+    return json_response(batch_body(items, not_found, to_dict), HTTPStatus.OK)
+
+@director_bp.post('/batch-get')
+@with_db_session
+def batch_get_directors(db: Session):
+    try:
+        director_ids, include = read_id_payload(request.get_json(silent=True), DIRECTOR_INCLUDES)
+    except LookupRequestException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+    return _batch_directors_response(db, director_ids, include)
+
 @director_bp.get('')
-def get_all_directors():
-    db = next(get_db())
-    directors = director_service.get_all_directors_service(db)
-    response_data = [DirectorResponse.model_validate(d).model_dump() for d in directors]
-    return jsonify(response_data), HTTPStatus.OK
+@with_db_session
+def get_all_directors(db: Session):
+    if 'ids' in request.args:
+        try:
+            director_ids, include = read_id_args(request.args, DIRECTOR_INCLUDES)
+        except LookupRequestException as e:
+            return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+        return _batch_directors_response(db, director_ids, include)
+    try:
+        fields = read_fields(request.args, director_serializer)
+        serializer = director_serializer.only(fields)
+        stream_format = read_stream_format(request.args)
+        if stream_format:
+            return streaming_response(
+                lambda session, chunk_size: director_service.iter_all_director_rows(session, chunk_size, fields),
+                serializer.to_dict,
+                stream_format
+            )
+        page_request = read_page_args(request.args, DIRECTOR_SORT_COLUMNS, "director_id")
+        if is_conditional():
+            version = director_service.get_directors_page_version(db, page_request)
+            if not_modified(version):
+                return not_modified_response(version)
+        page = director_service.get_all_director_rows_service(db, page_request, fields)
+    except (PaginationException, StreamingException, FieldsetException) as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+    headers = {**page_headers(page), **validator_headers(page_version("directors", page, "director_id"))}
+    return json_response(serializer.many(page.items), HTTPStatus.OK, headers)
 
 @director_bp.route('/', methods=['POST'])
-def create_director():
-    db = next(get_db())
+@with_db_session
+def create_director(db: Session):
     try:
         content = request.get_json()
         director_schema = DirectorCreate.model_validate(content)
     except ValidationError as e:
         return jsonify({"error": e.errors()}), HTTPStatus.BAD_REQUEST
 
-    new_director = director_service.create_new_director(db, director_schema)
+    try:
+        new_director = director_service.create_new_director(db, director_schema)
+    except director_service.DirectorAlreadyExistsException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.CONFLICT
     return jsonify(DirectorResponse.model_validate(new_director).model_dump()), HTTPStatus.CREATED
 
+@director_bp.post('/bulk')
+@with_db_session
+def bulk_create_directors(db: Session):
+    try:
+        report = director_service.bulk_create_directors(db, iter_records(request))
+    except BulkImportException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+    return jsonify(summarize(report)), HTTPStatus.OK
+
 @director_bp.get('/<int:director_id>')
-def get_director(director_id: int) -> Response:
-    director = director_service.get_director_by_id(director_id)
+@with_db_session
+def get_director(db: Session, director_id: int) -> Response:
+    version = None
+    if is_conditional():
+        version = director_service.get_director_version(db, director_id)
+        if version is None:
+            return jsonify({"error": "Director not found"}), HTTPStatus.NOT_FOUND
+        if not_modified(version):
+            return not_modified_response(version)
+
+    def load_director():
+        with primary_reads(db):
+            director = director_service.get_director_by_id(db, director_id)
+        return director_version(director), DirectorResponse.model_validate(director).model_dump()
+
+    try:
+        version, director_data = cached_representation("director", director_id, load_director, version)
+    except director_service.DirectorNotFoundException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.NOT_FOUND
+    return jsonify(director_data), HTTPStatus.OK, validator_headers(version)
+
+@director_bp.get('/by-imdb/<string:imdb_code>')
+@with_db_session
+def get_director_by_imdb(db: Session, imdb_code: str) -> Response:
+    try:
+        director = director_service.get_director_by_imdb_code(db, imdb_code)
+    except director_service.DirectorNotFoundException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.NOT_FOUND
     return jsonify(DirectorResponse.model_validate(director).model_dump()), HTTPStatus.OK
 
+@director_bp.post('/by-imdb')
+@with_db_session
+def resolve_director_imdb_codes(db: Session) -> Response:
+    try:
+        imdb_codes = read_imdb_codes(request.get_json(silent=True))
+    except LookupRequestException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+    return jsonify(director_service.resolve_director_imdb_codes(db, imdb_codes)), HTTPStatus.OK
+
 @director_bp.route('/<int:director_id>', methods=['PUT']) 
-def update_director(director_id: int):
-    db = next(get_db())
+@with_db_session
+def update_director(db: Session, director_id: int):
     try:
         content = request.get_json()
         director_update_schema = DirectorUpdate.model_validate(content)
     except ValidationError as e:
         return jsonify({"error": e.errors()}), HTTPStatus.BAD_REQUEST
 
-    updated_director = director_service.update_existing_director(db, director_id, director_update_schema)
-    return jsonify(DirectorResponse.model_validate(updated_director).model_dump()), HTTPStatus.OK
+    try:
+        expected_version = if_match_version(lambda: director_service.get_director_version(db, director_id))
+        updated_director = director_service.update_existing_director(
+            db, director_id, director_update_schema, expected_version
+        )
+    except director_service.DirectorNotFoundException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.NOT_FOUND
+    except PreconditionFailedException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.PRECONDITION_FAILED
+    return (
+        jsonify(DirectorResponse.model_validate(updated_director).model_dump()), HTTPStatus.OK,
+        validator_headers(director_version(updated_director))
+    )
 
 @director_bp.patch('/<int:director_id>')
-def patch_director(director_id: int) -> Response:
-    db = next(get_db())
+@with_db_session
+def patch_director(db: Session, director_id: int) -> Response:
     content = request.get_json()
-    updated_director = director_service.update_existing_director(db, director_id, DirectorUpdate.model_validate(content))
-    
-    return jsonify(DirectorResponse.model_validate(updated_director).model_dump()), HTTPStatus.OK
+    try:
+        expected_version = if_match_version(lambda: director_service.get_director_version(db, director_id))
+        updated_director = director_service.update_existing_director(
+            db, director_id, DirectorUpdate.model_validate(content), expected_version
+        )
+    except director_service.DirectorNotFoundException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.NOT_FOUND
+    except PreconditionFailedException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.PRECONDITION_FAILED
+
+    return (
+        jsonify(DirectorResponse.model_validate(updated_director).model_dump()), HTTPStatus.OK,
+        validator_headers(director_version(updated_director))
+    )
 
 @director_bp.delete('/<int:director_id>')
-def delete_director(director_id: int) -> Response:
-    db = next(get_db())
-    director_service.delete_existing_director(db, director_id)
+@with_db_session
+def delete_director(db: Session, director_id: int) -> Response:
+    try:
+        director_service.delete_existing_director(db, director_id)
+    except director_service.DirectorNotFoundException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.NOT_FOUND
     return jsonify({"message": "Director deleted"}), HTTPStatus.OK
 
 @director_bp.get('/<int:director_id>/movies')
-def get_director_movies(director_id: int) -> Response:
-    db = next(get_db())
-    movies_data = director_service.get_movies_by_director_id(db, director_id)
+@with_db_session
+def get_director_movies(db: Session, director_id: int) -> Response:
+    try:
+        movies_data = director_service.get_movies_by_director_id(db, director_id)
+    except director_service.DirectorNotFoundException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.NOT_FOUND
     response_data = [MovieResponse.model_validate(m).model_dump() for m in movies_data]
     return jsonify(response_data), HTTPStatus.OK
 
@@ -0,0 +1,19 @@
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from my_project.export import EXPORT_FORMATS, ExportException, iter_export, read_export_format
+
+export_bp = Blueprint('export', __name__, url_prefix='/export')
+
+
+@export_bp.route('/<any(movies, actors, directors):entity>', methods=['GET'])
+def export_endpoint(entity: str):
+    try:
+        export_format = read_export_format(request.args)
+    except ExportException as e:
+        return jsonify({"error": str(e)}), 400
+
+    # The export opens its own sessions: the generator outlives the request's.
+    return Response(
+        stream_with_context(iter_export(entity, export_format)),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename="{entity}.{export_format}"'},
+    )
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from pydantic import ValidationError
-from sqlalchemy.orm import Session, joinedload
-from my_project.database import get_db
+from sqlalchemy.orm import Session
+from my_project.database import primary_reads, with_db_session
 from my_project.service.movie_service import (
     create_new_movie,
     get_all_movies_service,
@@ -9,26 +9,41 @@ from my_project.service.movie_service import (
     update_existing_movie,
     delete_existing_movie,
     get_movies_with_facts,
+    bulk_create_movies,
+    iter_all_movies,
+    search_movies_service,
+    get_similar_movies_service,
+    get_movie_version,
+    get_movies_page_version,
+    get_all_movie_rows_service,
+    iter_all_movie_rows,
+    get_movies_batch,
+    get_movie_includes,
     MovieNotFoundException,
     MovieExistsException
 )
-from my_project.domain.models import Movie
-from my_project.domain.schemas import MovieCreate, MovieUpdate, MovieResponse, ActorResponse, DirectorResponse, MovieWithFactsResponse, MovieFactResponse
+from my_project.dao.movie_dao import MOVIE_INCLUDES, MOVIE_SORT_COLUMNS, movie_version_of
+from my_project.conditional import (
+    PreconditionFailedException, cached_representation, content_version, if_match_version, is_conditional,
+    not_modified, not_modified_response, page_version, validator_headers
+)
+from my_project.pagination import PaginationException, read_page_args, page_headers, clamp_limit
+from my_project.bulk_import import BulkImportException, iter_records, summarize
+from my_project.streaming import StreamingException, read_stream_format, streaming_response
+from my_project.domain.schemas import MovieCreate, MovieUpdate, MovieResponse, ActorResponse, DirectorResponse, MovieFactResponse
+from my_project.domain.schemas import (
+    movie_serializer, movie_with_facts_serializer, movie_fact_serializer, actor_serializer, director_serializer
+)
+from my_project.lookups import LookupRequestException, batch_body, read_id_args, read_id_payload, read_includes
+from my_project.serialization import json_response
+from my_project.response_cache import cached_response
+from my_project.fieldsets import FieldsetException, read_fields
+from my_project.similarity import SimilarityNotReadyException, settings as similarity_settings
 
 from http import HTTPStatus 
 
 movie_bp = Blueprint('movies', __name__, url_prefix='/movies')
 
-def with_db_session(f):
-    def wrapper(*args, **kwargs):
-        db = next(get_db())
-        try:
-            return f(*args, db=db, **kwargs)
-        finally:
-            db.close()
-    wrapper.__name__ = f.__name__
-    return wrapper
-
 @movie_bp.route('/', methods=['POST'])
 @with_db_session
 def create_movie_endpoint(db: Session):
@@ -43,22 +58,153 @@ def create_movie_endpoint(db: Session):
     except MovieExistsException as error:
         return jsonify({"error": str(error)}), HTTPStatus.CONFLICT
 
+@movie_bp.route('/bulk', methods=['POST'])
+@with_db_session
+def bulk_create_movies_endpoint(db: Session):
+    try:
+        report = bulk_create_movies(db, iter_records(request))
+    except BulkImportException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+    return jsonify(summarize(report)), HTTPStatus.OK
+
+INCLUDE_SERIALIZERS = {
+    "actors": lambda link: {
+        **actor_serializer.to_dict(link.actor),
+        "character_name": link.character_name,
+        "billing_order": link.billing_order,
+    },
+    "directors": director_serializer.to_dict,
+    "facts": movie_fact_serializer.to_dict,
+}
+
+
+def _included(db, movie_ids, include):
+    """{movie_id: {relationship: [dicts]}}, one query per relationship for all of ``movie_ids``."""
+    loaded = get_movie_includes(db, movie_ids, include)
+    return {
+        movie_id: {
+            name: [INCLUDE_SERIALIZERS[name](item) for item in loaded[name].get(movie_id, ())]
+            for name in include
+        }
+        for movie_id in movie_ids
+    }
+
+def _batch_movies_response(db, movie_ids, include):
+    items, not_found = get_movies_batch(db, movie_ids)
+    included = _included(db, [movie.movie_id for movie in items if movie is not None], include)
+
+    def to_dict(movie):
+        return {"movie_id": movie.movie_id, **movie_serializer.to_dict(movie), **included[movie.movie_id]}
+
+    return json_response(batch_body(items, not_found, to_dict), HTTPStatus.OK)
+
+@movie_bp.route('/batch-get', methods=['POST'])
+@with_db_session
+def batch_get_movies_endpoint(db: Session):
+    try:
+        movie_ids, include = read_id_payload(request.get_json(silent=True), MOVIE_INCLUDES)
+    except LookupRequestException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+    return _batch_movies_response(db, movie_ids, include)
+
 @movie_bp.route('/', methods=['GET'])
+@cached_response("movies", "movie_actors", "actors", "movie_directors", "directors", "movie_facts")
 @with_db_session
 def get_movies_endpoint(db: Session):
-    movies = get_all_movies_service(db, skip=0, limit=100)
-    response_data = []
-    
-    for m in movies:
-        movie_dict = MovieResponse.model_validate(m).model_dump()        
-        response_data.append(movie_dict)
+    if 'ids' in request.args:
+        try:
+            movie_ids, include = read_id_args(request.args, MOVIE_INCLUDES)
+        except LookupRequestException as e:
+            return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+        return _batch_movies_response(db, movie_ids, include)
+    try:
+        fields = read_fields(request.args, movie_serializer)
+        serializer = movie_serializer.only(fields)
+        include = read_includes(request.args, MOVIE_INCLUDES)
+        stream_format = read_stream_format(request.args)
+        if stream_format:
+            if include:
+                raise StreamingException("include cannot be combined with stream")
+            return streaming_response(
+                lambda session, chunk_size: iter_all_movie_rows(session, chunk_size, fields),
+                serializer.to_dict,
+                stream_format
+            )
+        page_request = read_page_args(request.args, MOVIE_SORT_COLUMNS, "movie_id")
+        # The page version does not cover included relationships.
+        if is_conditional() and not include:
+            version = get_movies_page_version(db, page_request)
+            if not_modified(version):
+                return not_modified_response(version)
+        page = get_all_movie_rows_service(db, page_request, fields)
+    except (PaginationException, StreamingException, FieldsetException, LookupRequestException) as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+
+    body = serializer.many(page.items)
+    version = page_version("movies", page, "movie_id")
+    if include:
+        included = _included(db, [row.movie_id for row in page.items], include)
+        body = [{**item, **included[row.movie_id]} for item, row in zip(body, page.items)]
+        version = content_version(version, [included[row.movie_id] for row in page.items])
+        if not_modified(version):
+            return not_modified_response(version)
+    return json_response(body, HTTPStatus.OK, {**page_headers(page), **validator_headers(version)})
+
+@movie_bp.get('/search')
+@with_db_session
+def search_movies_endpoint(db: Session):
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({"error": "Query parameter 'q' is required"}), HTTPStatus.BAD_REQUEST
+
+    results = search_movies_service(db, q, clamp_limit(request.args.get('limit', type=int)))
+    response_data = [
+        {**MovieResponse.model_validate(m).model_dump(), "score": score}
+        for m, score in results
+    ]
     return jsonify(response_data), HTTPStatus.OK
 
+@movie_bp.get('/<int:movie_id>/similar')
+@with_db_session
+def get_similar_movies_endpoint(db: Session, movie_id: int):
+    k = request.args.get('k', 10, type=int)
+    if not 1 <= k <= similarity_settings['top_k']:
+        return jsonify({"error": f"k must be between 1 and {similarity_settings['top_k']}"}), HTTPStatus.BAD_REQUEST
+
+    try:
+        results = get_similar_movies_service(db, movie_id, k)
+    except MovieNotFoundException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.NOT_FOUND
+    except SimilarityNotReadyException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.SERVICE_UNAVAILABLE, {'Retry-After': '30'}
+
+    response_data = [
+        {"movie_id": m.movie_id, **movie_serializer.to_dict(m), "score": round(score, 6)}
+        for m, score in results
+    ]
+    return json_response(response_data, HTTPStatus.OK)
+
 @movie_bp.route('/<int:movie_id>', methods=['GET'])
 @with_db_session
 def get_movie_endpoint(db: Session, movie_id: int):
     try:
-        movie = get_movie_by_id(db, movie_id)
+        include = read_includes(request.args, MOVIE_INCLUDES)
+    except LookupRequestException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
+
+    version = None
+    if is_conditional() and not include:
+        # Answer revalidations from the version columns alone, before loading the row.
+        version = get_movie_version(db, movie_id)
+        if version is None:
+            return jsonify({"error": "Movie not found"}), HTTPStatus.NOT_FOUND
+        if not_modified(version):
+            return not_modified_response(version)
+
+    def load_movie():
+        # Cached bodies outlive replica lag, so fill the cache from the primary.
+        with primary_reads(db):
+            movie = get_movie_by_id(db, movie_id, profile="detail")
         movie_dict = MovieResponse.model_validate(movie).model_dump()
         
         if movie.directors:
@@ -66,11 +212,22 @@ def get_movie_endpoint(db: Session, movie_id: int):
                 DirectorResponse.model_validate(d).model_dump()
                 for d in movie.directors
             ]
+        return movie_version_of(movie), movie_dict
 
-        return jsonify(movie_dict), HTTPStatus.OK
+    try:
+        version, movie_dict = cached_representation("movie", movie_id, load_movie, version)
     except MovieNotFoundException as e:
         return jsonify({"error": str(e)}), HTTPStatus.NOT_FOUND
 
+    if include:
+        # Included relationships are loaded per request; only the base body is cached.
+        included = _included(db, [movie_id], include)[movie_id]
+        movie_dict = {**movie_dict, **included}
+        version = content_version(version, included)
+        if not_modified(version):
+            return not_modified_response(version)
+    return jsonify(movie_dict), HTTPStatus.OK, validator_headers(version)
+
 @movie_bp.put('/<int:movie_id>')
 @with_db_session
 def update_movie_endpoint(db: Session, movie_id: int): 
@@ -81,10 +238,16 @@ def update_movie_endpoint(db: Session, movie_id: int):
         return jsonify({"error": e.errors()}), HTTPStatus.BAD_REQUEST
         
     try:
-        updated_movie = update_existing_movie(db, movie_id, movie_update_schema)
-        return jsonify(MovieResponse.model_validate(updated_movie).model_dump()), HTTPStatus.OK
+        expected_version = if_match_version(lambda: get_movie_version(db, movie_id))
+        updated_movie = update_existing_movie(db, movie_id, movie_update_schema, expected_version)
+        return (
+            jsonify(MovieResponse.model_validate(updated_movie).model_dump()), HTTPStatus.OK,
+            validator_headers(get_movie_version(db, movie_id))
+        )
     except MovieNotFoundException as e:
         return jsonify({"error": str(e)}), HTTPStatus.NOT_FOUND
+    except PreconditionFailedException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.PRECONDITION_FAILED
 
 @movie_bp.route('/<int:movie_id>', methods=['PATCH'])
 @with_db_session
@@ -96,10 +259,16 @@ def patch_movie_endpoint(db: Session, movie_id: int):
         return jsonify({"error": e.errors()}), HTTPStatus.BAD_REQUEST
     
     try:
-        updated_movie = update_existing_movie(db, movie_id, movie_update_schema)
-        return jsonify(MovieResponse.model_validate(updated_movie).model_dump()), HTTPStatus.OK
+        expected_version = if_match_version(lambda: get_movie_version(db, movie_id))
+        updated_movie = update_existing_movie(db, movie_id, movie_update_schema, expected_version)
+        return (
+            jsonify(MovieResponse.model_validate(updated_movie).model_dump()), HTTPStatus.OK,
+            validator_headers(get_movie_version(db, movie_id))
+        )
     except MovieNotFoundException as e:
         return jsonify({"error": str(e)}), HTTPStatus.NOT_FOUND
+    except PreconditionFailedException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.PRECONDITION_FAILED
 
 
 @movie_bp.delete('/<int:movie_id>')
@@ -115,7 +284,7 @@ def delete_movie_endpoint(db: Session, movie_id: int):
 @with_db_session
 def get_movie_actors_endpoint(db: Session, movie_id: int):
     try:
-        movie = get_movie_by_id(db, movie_id, options=joinedload(Movie.actors))
+        movie = get_movie_by_id(db, movie_id, profile="actors")
         
         actors_data = [
             ActorResponse.model_validate(ma).model_dump()  
@@ -130,7 +299,7 @@ def get_movie_actors_endpoint(db: Session, movie_id: int):
 @with_db_session
 def get_movie_directors_endpoint(db: Session, movie_id: int):
     try:
-        movie = get_movie_by_id(db, movie_id, options=joinedload(Movie.directors))
+        movie = get_movie_by_id(db, movie_id, profile="directors")
         
         if not movie.directors:
             return jsonify({"error": "No directors assigned to this movie"}), HTTPStatus.NOT_FOUND
@@ -146,11 +315,16 @@ def get_movie_directors_endpoint(db: Session, movie_id: int):
 
 
 @movie_bp.get('/movies-grouped-details') 
+@cached_response("movies", "movie_directors", "directors")
 @with_db_session
 def get_movies_grouped_details_endpoint(db: Session):
-    movies = get_all_movies_service(db, skip=0, limit=100)
+    try:
+        page_request = read_page_args(request.args, MOVIE_SORT_COLUMNS, "movie_id")
+        page = get_all_movies_service(db, page_request, profile="grouped_details")
+    except PaginationException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
     response_dict = {}    
-    for m in movies:
+    for m in page.items:
         movie_title = m.title
         directors_list = []
         if m.directors:
@@ -165,20 +339,27 @@ def get_movies_grouped_details_endpoint(db: Session):
             "directors": directors_list
         }
             
-    return jsonify(response_dict), HTTPStatus.OK
+    return jsonify(response_dict), HTTPStatus.OK, page_headers(page)
 
 
 @movie_bp.get('/movies-with-facts') 
+@cached_response("movies", "movie_facts")
 @with_db_session
 def get_movies_with_facts_endpoint(db: Session):
-    movies = get_movies_with_facts(db, skip=0, limit=100) 
+    try:
+        stream_format = read_stream_format(request.args)
+        if stream_format:
+            return streaming_response(
+                lambda session, chunk_size: iter_all_movies(session, chunk_size, profile="with_facts"),
+                movie_with_facts_serializer.to_dict,
+                stream_format
+            )
+        page_request = read_page_args(request.args, MOVIE_SORT_COLUMNS, "movie_id")
+        page = get_movies_with_facts(db, page_request)
+    except (PaginationException, StreamingException) as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
     
-    response_data = []
-    for m in movies:
-        movie_data = MovieWithFactsResponse.model_validate(m).model_dump()
-        response_data.append(movie_data)
-        
-    return jsonify(response_data), HTTPStatus.OK
+    return json_response(movie_with_facts_serializer.many(page.items), HTTPStatus.OK, page_headers(page))
 
 
 
@@ -186,12 +367,16 @@ def get_movies_with_facts_endpoint(db: Session):
 # У my_project/controller/movie_controller.py
 
 @movie_bp.get('/movies-facts-grouped') 
+@cached_response("movies", "movie_facts")
 @with_db_session
 def get_movies_facts_grouped_endpoint(db: Session):
-    from my_project.service.movie_service import get_movies_with_facts 
-    movies = get_movies_with_facts(db, skip=0, limit=100)
+    try:
+        page_request = read_page_args(request.args, MOVIE_SORT_COLUMNS, "movie_id")
+        page = get_all_movies_service(db, page_request, profile="fact_list")
+    except PaginationException as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
     response_dict = {}    
-    for m in movies:
+    for m in page.items:
         movie_key = f"Movie title : {m.title}"
         facts_list = []
         if m.movie_facts:
@@ -204,30 +389,39 @@ def get_movies_facts_grouped_endpoint(db: Session):
             ]
             response_dict[movie_key] = facts_list
             
-    return jsonify(response_dict), HTTPStatus.OK
+    return jsonify(response_dict), HTTPStatus.OK, page_headers(page)
 
 
 @movie_bp.get('/movies-facts-list') 
 @with_db_session
 def get_movies_facts_list_endpoint(db: Session):
-    from my_project.service.movie_service import get_movies_with_facts
-    movies = get_movies_with_facts(db, skip=0, limit=100)
-    
-    response_data = [] 
+    try:
+        stream_format = read_stream_format(request.args)
+        if stream_format:
+            return streaming_response(
+                lambda session, chunk_size: iter_all_movies(session, chunk_size, profile="fact_list"),
+                _movie_facts_entry,
+                stream_format
+            )
+        page_request = read_page_args(request.args, MOVIE_SORT_COLUMNS, "movie_id")
+        page = get_all_movies_service(db, page_request, profile="fact_list")
+    except (PaginationException, StreamingException) as e:
+        return jsonify({"error": str(e)}), HTTPStatus.BAD_REQUEST
     
-    for m in movies:
-        facts_list = []
-        if m.movie_facts:
-            facts_list = [
-                f.fact_text 
-                for f in m.movie_facts
-            ]
-        
-        movie_entry = {
-            "movie_title": m.title, 
-            "facts": facts_list      
-        }
-        
-        response_data.append(movie_entry)
+    response_data = [_movie_facts_entry(m) for m in page.items]
             
-    return jsonify(response_data), HTTPStatus.OK
\ No newline at end of file
+    return jsonify(response_data), HTTPStatus.OK, page_headers(page)
+
+
+def _movie_facts_entry(m):
+    facts_list = []
+    if m.movie_facts:
+        facts_list = [
+            f.fact_text 
+            for f in m.movie_facts
+        ]
+    
+    return {
+        "movie_title": m.title, 
+        "facts": facts_list      
+    }
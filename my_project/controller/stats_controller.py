@@ -0,0 +1,54 @@
+from flask import Blueprint, jsonify, request
+from sqlalchemy.orm import Session
+from my_project.database import with_db_session
+from my_project.dao.stats_dao import STATS_SORT_COLUMNS
+from my_project.pagination import PaginationException, read_page_args, page_headers
+from my_project.serialization import json_response
+from my_project.service.stats_service import (
+    StatsNotFoundException, average_rating, get_all_stats_service, get_stats
+)
+
+stats_bp = Blueprint('stats', __name__, url_prefix='/stats')
+
+# URL segment -> (summary kind, default sort, response builder)
+STATS_ENDPOINTS = {
+    "years": ("release_year", "release_year", lambda s: {
+        "release_year": s.release_year,
+        "movie_count": s.movie_count,
+        "rated_count": s.rated_count,
+        "average_rating": average_rating(s),
+    }),
+    "directors": ("director", "director_id", lambda s: {
+        "director_id": s.director_id,
+        "movie_count": s.movie_count,
+        "rated_count": s.rated_count,
+        "average_rating": average_rating(s),
+    }),
+    "actors": ("actor", "actor_id", lambda s: {
+        "actor_id": s.actor_id,
+        "movie_count": s.movie_count,
+    }),
+}
+
+
+@stats_bp.route('/<any(years, directors, actors):segment>', methods=['GET'])
+@with_db_session
+def get_all_stats_endpoint(db: Session, segment: str):
+    kind, default_sort, to_dict = STATS_ENDPOINTS[segment]
+    try:
+        page_request = read_page_args(request.args, STATS_SORT_COLUMNS[kind], default_sort)
+        page = get_all_stats_service(db, kind, page_request)
+    except PaginationException as e:
+        return jsonify({"error": str(e)}), 400
+    return json_response([to_dict(stats) for stats in page.items], 200, page_headers(page))
+
+
+@stats_bp.route('/<any(years, directors, actors):segment>/<int:key>', methods=['GET'])
+@with_db_session
+def get_stats_endpoint(db: Session, segment: str, key: int):
+    kind, _, to_dict = STATS_ENDPOINTS[segment]
+    try:
+        stats = get_stats(db, kind, key)
+    except StatsNotFoundException as e:
+        return jsonify({"error": str(e)}), 404
+    return jsonify(to_dict(stats)), 200
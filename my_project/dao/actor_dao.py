@@ -1,5 +1,20 @@
-from sqlalchemy import select
+from sqlalchemy import select, insert
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.exc import StaleDataError
 from my_project.domain.models import Actor
+from my_project.domain.schemas import actor_serializer
+from my_project.cache import entity_cache
+from my_project.conditional import PreconditionFailedException, make_version, page_version
+from my_project.dao.upsert import insert_if_absent
+from my_project.pagination import first_page, iter_all, paginate, paginate_rows
+
+ACTOR_SORT_COLUMNS = {
+    "actor_id": Actor.actor_id,
+}
+
+ACTOR_INCLUDES = {
+    "movies": selectinload(Actor.movies),
+}
 
 
 def get_actor(db, actor_id: int):
@@ -7,6 +22,31 @@ def get_actor(db, actor_id: int):
     return db.scalars(query).first()
 
 
+def get_actors_by_ids(db, actor_ids, include=()):
+    query = select(Actor).where(Actor.actor_id.in_(actor_ids)).options(*(ACTOR_INCLUDES[name] for name in include))
+    return {actor.actor_id: actor for actor in db.scalars(query)}
+
+
+def actor_version(row):
+    return make_version("actor", (row.actor_id, row.version), row.updated_at, row.version)
+
+
+def get_actor_version(db, actor_id: int):
+    query = select(Actor.actor_id, Actor.version, Actor.updated_at).where(Actor.actor_id == actor_id)
+    row = db.execute(query).first()
+    return actor_version(row) if row else None
+
+
+def get_actor_by_imdb(db, imdb_code: str):
+    query = select(Actor).where(Actor.imdb_code == imdb_code)
+    return db.scalars(query).first()
+
+
+def resolve_actor_imdb_codes(db, imdb_codes):
+    query = select(Actor.imdb_code, Actor.actor_id).where(Actor.imdb_code.in_(imdb_codes))
+    return dict(db.execute(query).all())
+
+
 def get_actor_by_name(db, name: str, last_name: str, birth_date: int, nationality: str, bio: str, imdb_code: int):
     query = select(Actor).where(
         Actor.name == name,
@@ -19,19 +59,64 @@ def get_actor_by_name(db, name: str, last_name: str, birth_date: int, nationalit
     return db.scalars(query).first()
 
 
-def get_all_actors(db, skip=0, limit=100):
-    query = select(Actor).offset(skip).limit(limit)
-    return db.scalars(query).all()
+def get_all_actors(db, page_request=None):
+    page_request = page_request or first_page("actor_id")
+    sort_column = ACTOR_SORT_COLUMNS[page_request.sort_by]
+    return paginate(db, select(Actor), sort_column, Actor.actor_id, page_request)
+
 
+def get_all_actor_rows(db, page_request=None, fields=None):
+    """A page of plain rows holding just the columns the list response and its validators read.
 
-def create_actor(db, actor_schema):
-    actor_data = actor_schema.model_dump()
-    db_actor = Actor(**actor_data)
+    ``fields`` narrows the response columns to a sparse fieldset.
+    """
+    page_request = page_request or first_page("actor_id")
+    sort_column = ACTOR_SORT_COLUMNS[page_request.sort_by]
+    columns = dict.fromkeys([
+        Actor.actor_id, Actor.version, Actor.updated_at, sort_column,
+        *(getattr(Actor, field) for field in fields or actor_serializer.fields),
+    ])
+    return paginate_rows(db, select(*columns), sort_column, Actor.actor_id, page_request)
 
-    db.add(db_actor)
+
+def iter_actor_rows(db, chunk_size, fields=None):
+    return iter_all(lambda page_request: get_all_actor_rows(db, page_request, fields), "actor_id", chunk_size)
+
+
+def get_actors_page_version(db, page_request=None):
+    page_request = page_request or first_page("actor_id")
+    sort_column = ACTOR_SORT_COLUMNS[page_request.sort_by]
+    columns = dict.fromkeys([Actor.actor_id, Actor.version, Actor.updated_at, sort_column])
+    page = paginate_rows(db, select(*columns), sort_column, Actor.actor_id, page_request)
+    return page_version("actors", page, "actor_id")
+
+
+def iter_actors(db, chunk_size):
+    return iter_all(lambda page_request: get_all_actors(db, page_request), "actor_id", chunk_size)
+
+
+def create_actor(db, actor_schema, before_commit=None):
+    return insert_if_absent(db, Actor, actor_schema.model_dump(), before_commit)
+
+
+def find_existing_actor_keys(db, actors):
+    imdb_codes = {a.imdb_code for a in actors}
+    query = select(Actor.imdb_code).where(Actor.imdb_code.in_(imdb_codes))
+    return {("imdb", code) for code in db.scalars(query)}
+
+
+def bulk_insert_actors(db, actors, before_commit=None):
+    """Insert the rows and return their ids; ``before_commit(ids)`` runs in the same transaction."""
+    db.execute(insert(Actor), [a.model_dump() for a in actors])
+    imdb_codes = [a.imdb_code for a in actors]
+    ids = dict(db.execute(
+        select(Actor.imdb_code, Actor.actor_id).where(Actor.imdb_code.in_(imdb_codes))
+    ).all())
+    ids = [ids.get(code) for code in imdb_codes]
+    if before_commit is not None:
+        before_commit(ids)
     db.commit()
-    db.refresh(db_actor)
-    return db_actor
+    return ids
 
 
 def update_actor(db, db_actor, actor_update):
@@ -40,14 +125,21 @@ def update_actor(db, db_actor, actor_update):
     for key, value in update_data.items():
         setattr(db_actor, key, value)
 
-    db.commit()
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise PreconditionFailedException("Actor was modified concurrently")
+    entity_cache.invalidate("actor", db_actor.actor_id)
     db.refresh(db_actor)
     return db_actor
 
 
 def delete_actor(db, db_actor):
+    actor_id = db_actor.actor_id
     db.delete(db_actor)
     db.commit()
+    entity_cache.invalidate("actor", actor_id)
 
 
 def get_movies_by_actor(db, actor_id: int):
@@ -1,5 +1,20 @@
-from sqlalchemy import select
+from sqlalchemy import select, insert
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.exc import StaleDataError
 from my_project.domain.models import Director
+from my_project.domain.schemas import director_serializer
+from my_project.cache import entity_cache
+from my_project.conditional import PreconditionFailedException, make_version, page_version
+from my_project.dao.upsert import insert_if_absent
+from my_project.pagination import first_page, iter_all, paginate, paginate_rows
+
+DIRECTOR_SORT_COLUMNS = {
+    "director_id": Director.director_id,
+}
+
+DIRECTOR_INCLUDES = {
+    "movies": selectinload(Director.movies),
+}
 
 
 def get_director(db, director_id: int):
@@ -7,11 +22,33 @@ def get_director(db, director_id: int):
     return db.scalars(query).first()
 
 
+def get_directors_by_ids(db, director_ids, include=()):
+    query = select(Director).where(Director.director_id.in_(director_ids)).options(
+        *(DIRECTOR_INCLUDES[name] for name in include)
+    )
+    return {director.director_id: director for director in db.scalars(query)}
+
+
+def director_version(row):
+    return make_version("director", (row.director_id, row.version), row.updated_at, row.version)
+
+
+def get_director_version(db, director_id: int):
+    query = select(Director.director_id, Director.version, Director.updated_at).where(Director.director_id == director_id)
+    row = db.execute(query).first()
+    return director_version(row) if row else None
+
+
 def get_director_by_imdb(db, imdb_code: str):
     query = select(Director).where(Director.imdb_code == imdb_code)
     return db.scalars(query).first()
 
 
+def resolve_director_imdb_codes(db, imdb_codes):
+    query = select(Director.imdb_code, Director.director_id).where(Director.imdb_code.in_(imdb_codes))
+    return dict(db.execute(query).all())
+
+
 def get_director_by_name(db, first_name: str, last_name: str, nationality:str, imdb_code:str):
     query = select(Director).where(
         Director.first_name == first_name,
@@ -22,35 +59,96 @@ def get_director_by_name(db, first_name: str, last_name: str, nationality:str, i
     return db.scalars(query).first()
 
 
-def get_all_directors(db, skip=0, limit=100):
-    query = select(Director).offset(skip).limit(limit)
-    return db.scalars(query).all()
+def get_all_directors(db, page_request=None):
+    page_request = page_request or first_page("director_id")
+    sort_column = DIRECTOR_SORT_COLUMNS[page_request.sort_by]
+    return paginate(db, select(Director), sort_column, Director.director_id, page_request)
+
+
+def get_all_director_rows(db, page_request=None, fields=None):
+    """A page of plain rows holding just the columns the list response and its validators read.
+
+    ``fields`` narrows the response columns to a sparse fieldset.
+    """
+    page_request = page_request or first_page("director_id")
+    sort_column = DIRECTOR_SORT_COLUMNS[page_request.sort_by]
+    columns = dict.fromkeys([
+        Director.director_id, Director.version, Director.updated_at, sort_column,
+        *(getattr(Director, field) for field in fields or director_serializer.fields),
+    ])
+    return paginate_rows(db, select(*columns), sort_column, Director.director_id, page_request)
 
 
-def create_director(db, director_schema):
-    director_data = director_schema.model_dump()
-    db_director = Director(**director_data)
+def iter_director_rows(db, chunk_size, fields=None):
+    return iter_all(lambda page_request: get_all_director_rows(db, page_request, fields), "director_id", chunk_size)
 
-    db.add(db_director)
+
+def get_directors_page_version(db, page_request=None):
+    page_request = page_request or first_page("director_id")
+    sort_column = DIRECTOR_SORT_COLUMNS[page_request.sort_by]
+    columns = dict.fromkeys([Director.director_id, Director.version, Director.updated_at, sort_column])
+    page = paginate_rows(db, select(*columns), sort_column, Director.director_id, page_request)
+    return page_version("directors", page, "director_id")
+
+
+def iter_directors(db, chunk_size):
+    return iter_all(lambda page_request: get_all_directors(db, page_request), "director_id", chunk_size)
+
+
+def create_director(db, director_schema, before_commit=None):
+    return insert_if_absent(db, Director, director_schema.model_dump(), before_commit)
+
+
+def _invalidate_director(director_id, movie_ids):
+    entity_cache.invalidate("director", director_id)
+    # Cached movie details embed their directors.
+    for movie_id in movie_ids:
+        entity_cache.invalidate("movie", movie_id)
+
+
+def find_existing_director_keys(db, directors):
+    imdb_codes = {d.imdb_code for d in directors}
+    query = select(Director.imdb_code).where(Director.imdb_code.in_(imdb_codes))
+    return {("imdb", code) for code in db.scalars(query)}
+
+
+def bulk_insert_directors(db, directors, before_commit=None):
+    """Insert the rows and return their ids; ``before_commit(ids)`` runs in the same transaction."""
+    db.execute(insert(Director), [d.model_dump() for d in directors])
+    imdb_codes = [d.imdb_code for d in directors]
+    ids = dict(db.execute(
+        select(Director.imdb_code, Director.director_id).where(Director.imdb_code.in_(imdb_codes))
+    ).all())
+    ids = [ids.get(code) for code in imdb_codes]
+    if before_commit is not None:
+        before_commit(ids)
     db.commit()
-    db.refresh(db_director)
-    return db_director
+    return ids
 
 
 def update_director(db, db_director, director_update):
     update_data = director_update.model_dump(exclude_unset=True)
+    movie_ids = [m.movie_id for m in db_director.movies]
 
     for key, value in update_data.items():
         setattr(db_director, key, value)
 
-    db.commit()
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise PreconditionFailedException("Director was modified concurrently")
+    _invalidate_director(db_director.director_id, movie_ids)
     db.refresh(db_director)
     return db_director
 
 
 def delete_director(db, db_director):
+    director_id = db_director.director_id
+    movie_ids = [m.movie_id for m in db_director.movies]
     db.delete(db_director)
     db.commit()
+    _invalidate_director(director_id, movie_ids)
 
 
 def get_movies_by_director(db, director_id: int):
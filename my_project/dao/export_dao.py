@@ -0,0 +1,71 @@
+from sqlalchemy import select
+from my_project.domain.models import Movie, Actor, Director, MovieActor, MovieDirector, MovieFact
+from my_project.pagination import iter_pages, paginate_rows
+
+# Base columns written for each exportable entity, in output order.
+EXPORT_COLUMNS = {
+    "movies": (
+        Movie.movie_id, Movie.title, Movie.release_year, Movie.duration, Movie.description,
+        Movie.imdb_code, Movie.rating, Movie.updated_at,
+    ),
+    "actors": (
+        Actor.actor_id, Actor.name, Actor.last_name, Actor.birth_date, Actor.nationality,
+        Actor.bio, Actor.imdb_code, Actor.updated_at,
+    ),
+    "directors": (
+        Director.director_id, Director.first_name, Director.last_name, Director.nationality,
+        Director.imdb_code, Director.updated_at,
+    ),
+}
+
+CAST_COLUMNS = (MovieActor.actor_id, Actor.name, Actor.last_name, MovieActor.character_name, MovieActor.billing_order)
+CREW_COLUMNS = (MovieDirector.director_id, Director.first_name, Director.last_name)
+
+
+def iter_entity_batches(db, entity, batch_size):
+    """Batches of plain rows in primary-key order, one keyset query per batch."""
+    columns = EXPORT_COLUMNS[entity]
+    pk_column = columns[0]
+    query = select(*columns)
+    return iter_pages(
+        lambda page_request: paginate_rows(db, query, pk_column, pk_column, page_request),
+        pk_column.key,
+        batch_size,
+    )
+
+
+def _grouped(rows):
+    grouped = {}
+    for movie_id, *values in rows:
+        grouped.setdefault(movie_id, []).append(values)
+    return grouped
+
+
+def cast_for_movies(db, movie_ids):
+    """{movie_id: [CAST_COLUMNS values]} for a batch of movies, in billing order."""
+    query = (
+        select(MovieActor.movie_id, *CAST_COLUMNS)
+        .join(Actor, Actor.actor_id == MovieActor.actor_id)
+        .where(MovieActor.movie_id.in_(movie_ids))
+        .order_by(MovieActor.movie_id, MovieActor.billing_order.is_(None), MovieActor.billing_order, MovieActor.actor_id)
+    )
+    return _grouped(db.execute(query))
+
+
+def crew_for_movies(db, movie_ids):
+    query = (
+        select(MovieDirector.movie_id, *CREW_COLUMNS)
+        .join(Director, Director.director_id == MovieDirector.director_id)
+        .where(MovieDirector.movie_id.in_(movie_ids))
+        .order_by(MovieDirector.movie_id, Director.director_id)
+    )
+    return _grouped(db.execute(query))
+
+
+def facts_for_movies(db, movie_ids):
+    query = (
+        select(MovieFact.movie_id, MovieFact.fact_text)
+        .where(MovieFact.movie_id.in_(movie_ids))
+        .order_by(MovieFact.movie_id, MovieFact.fact_id)
+    )
+    return _grouped(db.execute(query))
@@ -0,0 +1,42 @@
+from itertools import chain
+
+from sqlalchemy import func, select
+from my_project.domain.models import MovieActor, MovieDirector
+from my_project.pagination import iter_pages, paginate_rows
+
+LINK_BATCH_SIZE = 50_000
+
+
+def _link_pages(db, columns, sort_column, pk_column):
+    """Batches of link rows in (sort_column, pk_column) order, one keyset query per batch.
+
+    Paged rather than streamed: mysqlconnector buffers a whole result set client-side, so
+    a single SELECT over a link table would hold all of it in memory at once.
+    """
+    query = select(*columns)
+    return iter_pages(
+        lambda page_request: paginate_rows(db, query, sort_column, pk_column, page_request),
+        sort_column.key,
+        LINK_BATCH_SIZE,
+    )
+
+
+def iter_cast_links(db, by="actor"):
+    """(actor_id, movie_id) pairs ordered by actor, or (movie_id, actor_id) ordered by movie."""
+    if by == "actor":
+        key, value = MovieActor.actor_id, MovieActor.movie_id
+    else:
+        key, value = MovieActor.movie_id, MovieActor.actor_id
+    return chain.from_iterable(_link_pages(db, (key, value), key, value))
+
+
+def iter_cast_link_batches(db):
+    """(movie_id, actor_id, billing_order) batches; an unknown billing order reads as 0."""
+    columns = (MovieActor.movie_id, MovieActor.actor_id, func.coalesce(MovieActor.billing_order, 0))
+    return _link_pages(db, columns, MovieActor.movie_id, MovieActor.actor_id)
+
+
+def iter_crew_link_batches(db):
+    """(movie_id, director_id) batches."""
+    columns = (MovieDirector.movie_id, MovieDirector.director_id)
+    return _link_pages(db, columns, MovieDirector.movie_id, MovieDirector.director_id)
@@ -1,11 +1,133 @@
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload, Session, selectinload
-from my_project.domain.models import Movie
+from sqlalchemy import select, insert, tuple_
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
+from sqlalchemy.orm.exc import StaleDataError
+from my_project.domain.models import Movie, Director, MovieActor, MovieDirector, MovieFact
+from my_project.domain.schemas import movie_serializer
+from my_project.cache import entity_cache
+from my_project.conditional import PreconditionFailedException, make_version, page_version
+from my_project.dao.upsert import insert_if_absent
+from my_project.pagination import first_page, iter_all, paginate, paginate_rows
+
+MOVIE_SORT_COLUMNS = {
+    "movie_id": Movie.movie_id,
+    "release_year": Movie.release_year,
+    "rating": Movie.rating,
+}
+
+# Relationships each endpoint serialises, loaded with one extra batched query
+# per relationship regardless of how many movies are on the page.
+LOADING_PROFILES = {
+    "detail": (selectinload(Movie.directors),),
+    "actors": (selectinload(Movie.actors),),
+    "directors": (selectinload(Movie.directors),),
+    "grouped_details": (selectinload(Movie.directors),),
+    "with_facts": (selectinload(Movie.movie_facts).load_only(MovieFact.fact_text),),
+    "fact_list": (selectinload(Movie.movie_facts).load_only(MovieFact.fact_text),),
+}
+
+# Movie columns a profile's response reads. Profiles not listed load every column; the
+# rest leave unread columns such as the description TEXT out of the SELECT.
+PROFILE_COLUMNS = {
+    "fact_list": (Movie.title,),
+}
+
+
+def loading_options(profile=None, sort_column=None):
+    if profile is None:
+        return ()
+    options = LOADING_PROFILES[profile]
+    columns = PROFILE_COLUMNS.get(profile)
+    if columns:
+        # The sort column stays loaded for the next page's cursor.
+        options = (load_only(*dict.fromkeys((*columns, sort_column or Movie.movie_id))), *options)
+    return options
+
+
+def get_movie_by_id(db, movie_id: int, profile=None):
+    query = select(Movie).where(Movie.movie_id == movie_id).options(*loading_options(profile))
+    return db.scalars(query).first()
 
 
-def get_movie_by_id(db, movie_id: int):
-    query = select(Movie).where(Movie.movie_id == movie_id)
-    return db.scalars(query).first()
+def movie_version(movie_id, version, updated_at, directors):
+    """Validators for a movie detail, which embeds its directors: (director_id, version, updated_at)."""
+    directors = sorted(directors)
+    last_modified = max([updated_at, *(d[2] for d in directors)])
+    parts = (movie_id, version, [(d[0], d[1]) for d in directors])
+    return make_version("movie", parts, last_modified, version)
+
+
+def movie_version_of(movie):
+    return movie_version(
+        movie.movie_id, movie.version, movie.updated_at,
+        [(d.director_id, d.version, d.updated_at) for d in movie.directors]
+    )
+
+
+def get_movie_version(db, movie_id: int):
+    query = (
+        select(Movie.version, Movie.updated_at, Director.director_id, Director.version, Director.updated_at)
+        .outerjoin(Movie.directors)
+        .where(Movie.movie_id == movie_id)
+    )
+    rows = db.execute(query).all()
+    if not rows:
+        return None
+    directors = [(director_id, version, updated_at) for _, _, director_id, version, updated_at in rows if director_id is not None]
+    return movie_version(movie_id, rows[0][0], rows[0][1], directors)
+
+
+def get_movies_by_ids(db, movie_ids):
+    query = select(Movie).where(Movie.movie_id.in_(movie_ids))
+    return {movie.movie_id: movie for movie in db.scalars(query)}
+
+
+def _group_by_movie(pairs):
+    grouped = {}
+    for movie_id, item in pairs:
+        grouped.setdefault(movie_id, []).append(item)
+    return grouped
+
+
+def load_cast(db, movie_ids):
+    """{movie_id: [MovieActor with .actor loaded]} in billing order, unbilled last."""
+    query = (
+        select(MovieActor)
+        .options(joinedload(MovieActor.actor))
+        .where(MovieActor.movie_id.in_(movie_ids))
+        .order_by(MovieActor.movie_id, MovieActor.billing_order.is_(None), MovieActor.billing_order, MovieActor.actor_id)
+    )
+    return _group_by_movie((link.movie_id, link) for link in db.scalars(query))
+
+
+def load_directors(db, movie_ids):
+    query = (
+        select(MovieDirector.movie_id, Director)
+        .join(Director, Director.director_id == MovieDirector.director_id)
+        .where(MovieDirector.movie_id.in_(movie_ids))
+        .order_by(MovieDirector.movie_id, Director.director_id)
+    )
+    return _group_by_movie(db.execute(query).tuples())
+
+
+def load_facts(db, movie_ids):
+    query = select(MovieFact).where(MovieFact.movie_id.in_(movie_ids)).order_by(MovieFact.movie_id, MovieFact.fact_id)
+    return _group_by_movie((fact.movie_id, fact) for fact in db.scalars(query))
+
+
+# Relationships a response may include, each loaded with one IN query for the whole set of
+# movies, however many there are.
+MOVIE_INCLUDES = {
+    "actors": load_cast,
+    "directors": load_directors,
+    "facts": load_facts,
+}
+
+
+def load_movie_includes(db, movie_ids, include):
+    """{relationship: {movie_id: [items]}} for each name in ``include``."""
+    if not movie_ids:
+        return {name: {} for name in include}
+    return {name: MOVIE_INCLUDES[name](db, movie_ids) for name in include}
 
 
 def get_movie_by_title_and_year(db, title: str, release_year: int):
@@ -16,19 +138,72 @@ def get_movie_by_title_and_year(db, title: str, release_year: int):
     return db.scalars(query).first()
 
 
-def get_all_movies(db, skip=0, limit=100):
-    query = select(Movie).offset(skip).limit(limit)
-    return db.scalars(query).all()
+def get_all_movies(db, page_request=None, profile=None):
+    page_request = page_request or first_page("movie_id")
+    sort_column = MOVIE_SORT_COLUMNS[page_request.sort_by]
+    query = select(Movie).options(*loading_options(profile, sort_column))
+    return paginate(db, query, sort_column, Movie.movie_id, page_request)
+
+
+def get_all_movie_rows(db, page_request=None, fields=None):
+    """A page of plain rows holding just the columns the list response and its validators read.
+
+    ``fields`` narrows the response columns to a sparse fieldset.
+    """
+    page_request = page_request or first_page("movie_id")
+    sort_column = MOVIE_SORT_COLUMNS[page_request.sort_by]
+    columns = dict.fromkeys([
+        Movie.movie_id, Movie.version, Movie.updated_at, sort_column,
+        *(getattr(Movie, field) for field in fields or movie_serializer.fields),
+    ])
+    return paginate_rows(db, select(*columns), sort_column, Movie.movie_id, page_request)
+
+
+def iter_movie_rows(db, chunk_size, fields=None):
+    return iter_all(lambda page_request: get_all_movie_rows(db, page_request, fields), "movie_id", chunk_size)
+
 
+def get_movies_page_version(db, page_request=None):
+    page_request = page_request or first_page("movie_id")
+    sort_column = MOVIE_SORT_COLUMNS[page_request.sort_by]
+    columns = dict.fromkeys([Movie.movie_id, Movie.version, Movie.updated_at, sort_column])
+    page = paginate_rows(db, select(*columns), sort_column, Movie.movie_id, page_request)
+    return page_version("movies", page, "movie_id")
 
 
-def create_movie(db: Session, movie_schema):
-    movie_data = movie_schema.model_dump()
-    db_movie = Movie(**movie_data)
-    db.add(db_movie)
+def iter_movies(db, chunk_size, profile=None):
+    return iter_all(lambda page_request: get_all_movies(db, page_request, profile), "movie_id", chunk_size)
+
+
+def create_movie(db: Session, movie_schema, before_commit=None):
+    return insert_if_absent(db, Movie, movie_schema.model_dump(), before_commit)
+
+
+def find_existing_movie_keys(db, movies):
+    title_years = {(m.title, m.release_year) for m in movies}
+    imdb_codes = {m.imdb_code for m in movies}
+    query = select(Movie.title, Movie.release_year, Movie.imdb_code).where(
+        tuple_(Movie.title, Movie.release_year).in_(title_years) | Movie.imdb_code.in_(imdb_codes)
+    )
+    existing = set()
+    for title, release_year, imdb_code in db.execute(query):
+        existing.add(("title", title, release_year))
+        existing.add(("imdb", imdb_code))
+    return existing
+
+
+def bulk_insert_movies(db, movies, before_commit=None):
+    """Insert the rows and return their ids; ``before_commit(ids)`` runs in the same transaction."""
+    db.execute(insert(Movie), [m.model_dump() for m in movies])
+    imdb_codes = [m.imdb_code for m in movies]
+    ids = dict(db.execute(
+        select(Movie.imdb_code, Movie.movie_id).where(Movie.imdb_code.in_(imdb_codes))
+    ).all())
+    ids = [ids.get(code) for code in imdb_codes]
+    if before_commit is not None:
+        before_commit(ids)
     db.commit()
-    db.refresh(db_movie)
-    return db_movie
+    return ids
 
 
 def update_movie(db, db_movie, movie_update):
@@ -37,26 +212,33 @@ def update_movie(db, db_movie, movie_update):
     for key, value in update_data.items():
         setattr(db_movie, key, value)
 
-    db.commit()
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise PreconditionFailedException("Movie was modified concurrently")
+    entity_cache.invalidate("movie", db_movie.movie_id)
     db.refresh(db_movie)
     return db_movie
 
 
 def delete_movie(db, db_movie):
+    movie_id = db_movie.movie_id
     db.delete(db_movie)
     db.commit()
+    entity_cache.invalidate("movie", movie_id)
 
 def get_actors_by_movie(db, movie_id: int):
-    movie = get_movie_by_id(db, movie_id)
+    movie = get_movie_by_id(db, movie_id, profile="actors")
     return movie.actors if movie else None
 
 def get_directors_by_movie(db, movie_id: int):
-    movie = get_movie_by_id(db, movie_id)
+    movie = get_movie_by_id(db, movie_id, profile="directors")
     return movie.directors if movie else None
 
 
-def movie_dao_get_movies_with_facts(db, skip=0, limit=100):
-    query = select(Movie).offset(skip).limit(limit).options(
-        selectinload(Movie.movie_facts)
-    )
-    return db.scalars(query).all()
\ No newline at end of file
+def movie_dao_get_movies_with_facts(db, page_request=None):
+    page_request = page_request or first_page("movie_id")
+    sort_column = MOVIE_SORT_COLUMNS[page_request.sort_by]
+    query = select(Movie).options(*loading_options("with_facts"))
+    return paginate(db, query, sort_column, Movie.movie_id, page_request)
@@ -0,0 +1,83 @@
+from sqlalchemy import inspect, select, text
+from my_project.domain.models import MOVIE_SEARCH_DDL, Movie, MovieFact
+
+# Title/description hits outrank a movie matched only through one of its facts.
+MOVIE_TEXT_WEIGHT = 2.0
+
+MYSQL_SEARCH = text("""
+    SELECT movie_id, SUM(score) AS score FROM (
+        SELECT movie_id, MATCH(title, description) AGAINST (:q IN NATURAL LANGUAGE MODE) * :weight AS score
+        FROM movies
+        WHERE MATCH(title, description) AGAINST (:q IN NATURAL LANGUAGE MODE)
+        UNION ALL
+        SELECT movie_id, MATCH(fact_text) AGAINST (:q IN NATURAL LANGUAGE MODE) AS score
+        FROM movie_facts
+        WHERE MATCH(fact_text) AGAINST (:q IN NATURAL LANGUAGE MODE)
+    ) AS hits
+    GROUP BY movie_id
+    ORDER BY score DESC
+    LIMIT :limit
+""")
+
+# bm25() is lower-is-better, so negate it to keep "higher score ranks first" on both backends.
+SQLITE_SEARCH = text("""
+    SELECT rowid AS movie_id, -bm25(movie_search, :weight, :weight, 1.0) AS score
+    FROM movie_search
+    WHERE movie_search MATCH :q
+    ORDER BY score DESC
+    LIMIT :limit
+""")
+
+
+def _fts5_query(q: str):
+    # Quote every term so user input is never parsed as FTS5 query syntax.
+    terms = ['"' + term.replace('"', '""') + '"' for term in q.split()]
+    return " OR ".join(terms)
+
+
+def search_movie_ids(db, q: str, limit: int):
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        query, q = SQLITE_SEARCH, _fts5_query(q)
+    else:
+        query = MYSQL_SEARCH
+    rows = db.execute(query, {"q": q, "weight": MOVIE_TEXT_WEIGHT, "limit": limit}).all()
+    return [(row.movie_id, float(row.score)) for row in rows]
+
+
+def search_movies(db, q: str, limit: int):
+    hits = search_movie_ids(db, q, limit)
+    if not hits:
+        return []
+    movies = db.scalars(select(Movie).where(Movie.movie_id.in_([movie_id for movie_id, _ in hits])))
+    by_id = {movie.movie_id: movie for movie in movies}
+    return [(by_id[movie_id], score) for movie_id, score in hits if movie_id in by_id]
+
+
+SQLITE_BACKFILL = [
+    "DELETE FROM movie_search",
+    """INSERT INTO movie_search(rowid, title, description, facts)
+        SELECT movie_id, title, description,
+            COALESCE((SELECT group_concat(fact_text, ' ') FROM movie_facts WHERE movie_facts.movie_id = movies.movie_id), '')
+        FROM movies""",
+]
+
+
+def rebuild_search_index(db):
+    """Create the search index where it is missing and fill it from the rows already stored.
+
+    create_all adds neither the FULLTEXT indexes to existing MySQL tables nor the rows
+    written before movie_search existed to the SQLite index.
+    """
+    conn = db.connection()
+    if conn.dialect.name == "sqlite":
+        for statement in MOVIE_SEARCH_DDL + SQLITE_BACKFILL:
+            db.execute(text(statement))
+    elif conn.dialect.name == "mysql":
+        # ALTER TABLE ... ADD FULLTEXT for each ft_* index the table does not have yet.
+        for table in (Movie.__table__, MovieFact.__table__):
+            existing = {index["name"] for index in inspect(conn).get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name.startswith("ft_") and index.name not in existing:
+                    index.create(conn)
+    db.commit()
@@ -0,0 +1,92 @@
+from sqlalchemy import delete, func, insert, select
+from my_project.domain.models import (
+    Movie, MovieActor, MovieDirector, ReleaseYearStats, DirectorStats, ActorStats
+)
+from my_project.dao.upsert import upsert_increment
+from my_project.pagination import first_page, paginate
+
+STATS_MODELS = {
+    "release_year": ReleaseYearStats,
+    "director": DirectorStats,
+    "actor": ActorStats,
+}
+
+STATS_SORT_COLUMNS = {
+    "release_year": {
+        "release_year": ReleaseYearStats.release_year,
+        "movie_count": ReleaseYearStats.movie_count,
+    },
+    "director": {
+        "director_id": DirectorStats.director_id,
+        "movie_count": DirectorStats.movie_count,
+    },
+    "actor": {
+        "actor_id": ActorStats.actor_id,
+        "movie_count": ActorStats.movie_count,
+    },
+}
+
+
+def _pk_column(kind):
+    return STATS_MODELS[kind].__table__.primary_key.columns[0]
+
+
+def get_stats(db, kind, key):
+    return db.get(STATS_MODELS[kind], key)
+
+
+def get_all_stats(db, kind, page_request=None):
+    pk_column = _pk_column(kind)
+    page_request = page_request or first_page(pk_column.key)
+    sort_column = STATS_SORT_COLUMNS[kind][page_request.sort_by]
+    return paginate(db, select(STATS_MODELS[kind]), sort_column, pk_column, page_request)
+
+
+def movie_links(db, movie_id):
+    """(director_ids, actor_ids) linked to a movie."""
+    director_ids = db.scalars(select(MovieDirector.director_id).where(MovieDirector.movie_id == movie_id)).all()
+    actor_ids = db.scalars(select(MovieActor.actor_id).where(MovieActor.movie_id == movie_id)).all()
+    return director_ids, actor_ids
+
+
+def add_to_release_year(db, release_year, deltas):
+    upsert_increment(db, ReleaseYearStats, {"release_year": release_year}, deltas)
+
+
+def add_to_directors(db, director_ids, deltas):
+    for director_id in director_ids:
+        upsert_increment(db, DirectorStats, {"director_id": director_id}, deltas)
+
+
+def add_to_actors(db, actor_ids, deltas):
+    for actor_id in actor_ids:
+        upsert_increment(db, ActorStats, {"actor_id": actor_id}, deltas)
+
+
+def delete_stats(db, kind, key):
+    db.execute(delete(STATS_MODELS[kind]).where(_pk_column(kind) == key))
+
+
+def rebuild_all(db):
+    """Recompute every summary table from the catalog in one transaction."""
+    for model in STATS_MODELS.values():
+        db.execute(delete(model))
+
+    db.execute(insert(ReleaseYearStats).from_select(
+        ["release_year", "movie_count", "rated_count", "rating_sum"],
+        select(Movie.release_year, func.count(), func.count(Movie.rating), func.coalesce(func.sum(Movie.rating), 0))
+        .group_by(Movie.release_year)
+    ))
+    db.execute(insert(DirectorStats).from_select(
+        ["director_id", "movie_count", "rated_count", "rating_sum"],
+        select(
+            MovieDirector.director_id, func.count(), func.count(Movie.rating), func.coalesce(func.sum(Movie.rating), 0)
+        )
+        .join(Movie, Movie.movie_id == MovieDirector.movie_id)
+        .group_by(MovieDirector.director_id)
+    ))
+    db.execute(insert(ActorStats).from_select(
+        ["actor_id", "movie_count"],
+        select(MovieActor.actor_id, func.count()).group_by(MovieActor.actor_id)
+    ))
+    db.commit()
@@ -0,0 +1,13 @@
+from sqlalchemy import select
+from my_project.dao.upsert import increment_statement
+from my_project.domain.models import TableVersion
+
+
+def read_versions(conn):
+    """{table_name: version} for every table that has been written since the schema was created."""
+    return dict(conn.execute(select(TableVersion.table_name, TableVersion.version)).all())
+
+
+def bump_versions(conn, tables):
+    for table in sorted(tables):
+        conn.execute(increment_statement(conn.dialect.name, TableVersion.__table__, {"table_name": table}, {"version": 1}))
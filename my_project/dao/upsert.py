@@ -0,0 +1,79 @@
+from sqlalchemy import insert
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import make_transient_to_detached
+
+MYSQL_DUPLICATE_KEY = 1062
+
+ON_CONFLICT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def _attach(db, model, values):
+    # Build the persistent instance from what the INSERT already returned instead of
+    # paying for a refresh SELECT.
+    instance = model(**values)
+    make_transient_to_detached(instance)
+    db.add(instance)
+    return instance
+
+
+def insert_if_absent(db, model, values: dict, before_commit=None):
+    """Insert one row in a single statement, relying on the table's unique keys.
+
+    Returns the new instance, or None when a unique key already holds a row.
+    ``before_commit(row)`` runs only after an actual insert, in the same transaction, with
+    the new row's values.
+    """
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+
+    dialect_insert = ON_CONFLICT_INSERTS.get(dialect)
+    if dialect_insert is not None:
+        statement = dialect_insert(table).values(**values).on_conflict_do_nothing().returning(*table.columns)
+        row = db.execute(statement).mappings().first()
+        if row is None:
+            db.commit()
+            return None
+        row = dict(row)
+    else:
+        try:
+            result = db.execute(insert(table).values(**values))
+        except IntegrityError as e:
+            db.rollback()
+            if getattr(e.orig, "errno", None) != MYSQL_DUPLICATE_KEY:
+                raise
+            return None
+        primary_key = {column.key: value for column, value in zip(table.primary_key.columns, result.inserted_primary_key)}
+        # last_inserted_params() includes the column defaults the INSERT applied (versions, timestamps).
+        row = {**result.last_inserted_params(), **primary_key}
+
+    if before_commit is not None:
+        before_commit(row)
+    db.commit()
+    # Attached after the commit, which would otherwise expire it and cost a refresh SELECT.
+    return _attach(db, model, row)
+
+
+def increment_statement(dialect: str, table, key: dict, deltas: dict):
+    """INSERT ... ON CONFLICT/DUPLICATE KEY that adds ``deltas`` to the row at ``key``."""
+    if dialect == "mysql":
+        statement = mysql.insert(table).values(**key, **deltas)
+        return statement.on_duplicate_key_update(
+            {column: table.c[column] + statement.inserted[column] for column in deltas}
+        )
+    statement = ON_CONFLICT_INSERTS[dialect](table).values(**key, **deltas)
+    return statement.on_conflict_do_update(
+        index_elements=list(key),
+        set_={column: table.c[column] + statement.excluded[column] for column in deltas},
+    )
+
+
+def upsert_increment(db, model, key: dict, deltas: dict):
+    """Add ``deltas`` to the counters of the row at ``key``, creating it from the deltas if missing.
+
+    One atomic statement, so concurrent writers never lose an increment. Does not commit.
+    """
+    db.execute(increment_statement(db.get_bind().dialect.name, model.__table__, key, deltas))
@@ -1,28 +1,458 @@
-import yaml
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import g, has_app_context, has_request_context, jsonify, request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.ext.declarative import declarative_base
+from my_project.config import get_section
 
-with open('config/app.yml', 'r') as f:
-    config = yaml.safe_load(f)['database']
+config = get_section('database', {
+    'pool_size': 10,
+    'max_overflow': 20,
+    'pool_recycle': 1800,
+    'pool_pre_ping': True,
+    'pool_timeout': 5,
+    'replicas': [],
+    'replica_max_lag_seconds': 5,
+    'replica_lag_check_seconds': 2,
+    'replica_retry_seconds': 30,
+    'read_your_writes_seconds': 5,
+})
 print(f"DEBUG: database.py - Створено URL: ...@{config['db_host']}")
 
-DATABASE_URL = (
+# DATABASE_URL in the environment (e.g. a local SQLite file for benchmarks) overrides app.yml.
+DATABASE_URL = os.environ.get('DATABASE_URL') or (
     f"mysql+mysqlconnector://"
     f"{config['db_user']}:{config['db_pass']}@"
     f"{config['db_host']}:{config['db_port']}/"
     f"{config['db_name']}"
 )
 
-engine = create_engine(DATABASE_URL)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _replica_url(replica):
+    """A replica is a full URL, or a mapping overriding the primary's db_* settings."""
+    if isinstance(replica, str):
+        return replica
+    settings = {**config, **replica}
+    return (
+        f"mysql+mysqlconnector://"
+        f"{settings['db_user']}:{settings['db_pass']}@"
+        f"{settings['db_host']}:{settings['db_port']}/"
+        f"{settings['db_name']}"
+    )
+
+
+# DATABASE_REPLICA_URLS (comma-separated) overrides app.yml the same way.
+REPLICA_URLS = [url for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url] or [
+    _replica_url(replica) for replica in config['replicas'] or []
+]
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a free connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_metrics.record_wait(time.perf_counter() - started, timed_out=False)
+        return connection
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.rows_fetched = 0
+        self.rows_affected = 0
+        self.statements = Counter()
+
+    def record(self, statement, duration, rows_affected=0):
+        self.count += 1
+        self.duration += duration
+        self.rows_affected += rows_affected
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int):
+        return {statement: n for statement, n in self.statements.items() if n >= threshold}
+
+
+class _RowCountingCursor:
+    """DBAPI cursor that adds the rows a result reads from it to the request's QueryStats."""
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows_fetched += 1
+        return row
+
+    def fetchmany(self, *args):
+        rows = self._cursor.fetchmany(*args)
+        self._stats.rows_fetched += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows_fetched += len(rows)
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def _rows_affected(cursor, context):
+    # rowcount is only meaningful for DML; for SELECTs drivers report -1 or a buffered count.
+    # Textual DML has no compiled flags but, unlike a SELECT, returns no result rows.
+    is_dml = context is not None and (context.isinsert or context.isupdate or context.isdelete)
+    if not is_dml and cursor.description is not None:
+        return 0
+    return max(getattr(cursor, 'rowcount', 0) or 0, 0)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # A connection runs one statement at a time, so a single start time is enough.
+    conn.info['query_started'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop('query_started', None)
+    if started is None or not has_app_context():
+        return
+    stats = g.get('query_stats')
+    if stats is None:
+        return
+    stats.record(statement, time.perf_counter() - started, _rows_affected(cursor, context))
+    # The result object reads rows through context.cursor, so counting there sees every row
+    # the request actually consumes, however it is fetched.
+    if context is not None and cursor.description is not None and not isinstance(context.cursor, _RowCountingCursor):
+        context.cursor = _RowCountingCursor(context.cursor, stats)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not run for a failed statement.
+    if exception_context.connection is not None:
+        exception_context.connection.info.pop('query_started', None)
+
+
+def instrument_engine(target):
+    event.listen(target, "before_cursor_execute", _before_cursor_execute)
+    event.listen(target, "after_cursor_execute", _after_cursor_execute)
+    event.listen(target, "handle_error", _handle_error)
+
+
+# The engine is created on first use in each process, never at import time, so a pre-fork
+# server's master does not open connections its workers would then share.
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def _create_engine(url):
+    created = create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=config['pool_size'],
+        max_overflow=config['max_overflow'],
+        pool_recycle=config['pool_recycle'],
+        pool_pre_ping=config['pool_pre_ping'],
+        pool_timeout=config['pool_timeout'],
+    )
+    instrument_engine(created)
+    return created
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine(DATABASE_URL)
+    return _engine
+
+
+class Replica:
+    def __init__(self, url):
+        self.engine = _create_engine(url)
+        self.lag = None
+        self.down_until = 0.0
+        self.checked_at = 0.0
+        self._checking = threading.Lock()
+        event.listen(self.engine, "handle_error", self._on_error)
+
+    def _on_error(self, context):
+        if context.is_disconnect:
+            self.down_until = time.monotonic() + config['replica_retry_seconds']
+
+    def _measure_lag(self):
+        """Seconds behind the primary, or None when the replica is not replicating."""
+        dialect = self.engine.dialect.name
+        with self.engine.connect() as conn:
+            if dialect == "mysql":
+                row = conn.execute(text("SHOW REPLICA STATUS")).mappings().first()
+                return row["Seconds_Behind_Source"] if row else None
+            if dialect == "postgresql":
+                return float(conn.execute(text(
+                    "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+                )).scalar())
+            conn.execute(text("SELECT 1"))
+            return 0.0
+
+    def refresh(self):
+        """Re-measure lag at most every replica_lag_check_seconds; one thread at a time."""
+        now = time.monotonic()
+        if now - self.checked_at < config['replica_lag_check_seconds'] or not self._checking.acquire(blocking=False):
+            return
+        try:
+            self.checked_at = now
+            self.lag = self._measure_lag()
+        except DBAPIError:
+            self.lag = None
+            self.down_until = now + config['replica_retry_seconds']
+        finally:
+            self._checking.release()
+
+    def usable(self):
+        if time.monotonic() < self.down_until:
+            return False
+        self.refresh()
+        return self.lag is not None and self.lag <= config['replica_max_lag_seconds']
+
+    def stats(self):
+        return {
+            "url": self.engine.url.render_as_string(hide_password=True),
+            "lag_seconds": self.lag,
+            "down": time.monotonic() < self.down_until,
+        }
+
+
+class ReplicaSet:
+    """Round-robin over the replicas that are reachable and within the lag bound."""
+
+    def __init__(self, urls):
+        self.urls = urls
+        self._replicas = None
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def replicas(self):
+        if self._replicas is None:
+            with self._lock:
+                if self._replicas is None:
+                    self._replicas = [Replica(url) for url in self.urls]
+        return self._replicas
+
+    def choose(self):
+        """A replica engine, or None to read from the primary."""
+        if not self.urls:
+            return None
+        replicas = self.replicas()
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(replicas)
+        for offset in range(len(replicas)):
+            replica = replicas[(start + offset) % len(replicas)]
+            if replica.usable():
+                return replica.engine
+        return None
+
+    def stats(self):
+        return [replica.stats() for replica in self._replicas or []]
+
+    def reset(self):
+        for replica in self._replicas or []:
+            replica.engine.dispose(close=False)
+        self._replicas, self._lock = None, threading.Lock()
+
+
+replica_set = ReplicaSet(REPLICA_URLS)
+
+
+def _reset_after_fork():
+    global _engine_lock
+    _engine_lock = threading.Lock()
+    if _engine is not None:
+        # close=False: the sockets still belong to the parent; the child just forgets them
+        # and opens its own on first checkout.
+        _engine.dispose(close=False)
+    replica_set.reset()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class RoutingSession(Session):
+    """Reads go to the replica pinned in ``info['replica']``; flushes and DML go to the primary.
+
+    One replica serves the whole session, so its reads are consistent with each other.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get('replica')
+        if replica is None or self._flushing or isinstance(clause, UpdateBase):
+            return super().get_bind(mapper, clause=clause, **kw)
+        return replica
+
+
+class LazySessionMaker(sessionmaker):
+    """sessionmaker bound to this process's engine at call time.
+
+    With ``read_only=True`` each session is pinned to a healthy replica, falling back to
+    the primary when none is usable.
+    """
+
+    def __init__(self, *args, read_only=False, **kw):
+        super().__init__(*args, class_=RoutingSession, **kw)
+        self.read_only = read_only
+
+    def __call__(self, **local_kw):
+        local_kw.setdefault('bind', get_engine())
+        session = super().__call__(**local_kw)
+        if self.read_only:
+            session.info['replica'] = replica_set.choose()
+        return session
+
+
+SessionLocal = LazySessionMaker(autocommit=False, autoflush=False)
+ReadSessionLocal = LazySessionMaker(autocommit=False, autoflush=False, read_only=True)
+
+
+@contextmanager
+def primary_reads(db):
+    """Read from the primary inside the block, e.g. to fill a cache that outlives replica lag."""
+    replica = db.info.pop('replica', None)
+    try:
+        yield db
+    finally:
+        if replica is not None:
+            db.info['replica'] = replica
 
 Base = declarative_base()
 
+
+def init_db():
+    """Create any missing tables. Run once per deploy (``flask init-db``), not per worker."""
+    import my_project.domain.models  # noqa: F401 - registers the tables on Base.metadata
+    Base.metadata.create_all(bind=get_engine())
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Set on responses to writes; while present, the client's reads go to the primary so it
+# sees its own changes regardless of replica lag.
+PRIMARY_COOKIE = 'db_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def _reads_from_replica():
+    return (
+        has_request_context()
+        and request.method in SAFE_METHODS
+        and PRIMARY_COOKIE not in request.cookies
+        and not g.get('read_primary')
+    )
+
+
+def get_request_db():
+    if 'db' not in g:
+        g.db = ReadSessionLocal() if _reads_from_replica() else SessionLocal()
+    return g.db
+
+
+def _pin_reads_after_write(response):
+    if replica_set.urls and request.method not in SAFE_METHODS and response.status_code < 400:
+        response.set_cookie(
+            PRIMARY_COOKIE, '1', max_age=config['read_your_writes_seconds'], httponly=True, samesite='Lax'
+        )
+    return response
+
+
+def close_request_db(exception=None):
+    db = g.pop('db', None)
+    if db is None:
+        return
+    if exception is not None:
+        db.rollback()
+    db.close()
+
+
+def with_db_session(f):
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        return f(*args, db=get_request_db(), **kwargs)
+    return wrapper
+
+
+def pool_stats():
+    pool = get_engine().pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": config['max_overflow'],
+        "timeout_seconds": config['pool_timeout'],
+        **pool_metrics.snapshot(),
+        "replicas": replica_set.stats(),
+    }
+
+
+def handle_pool_timeout(error):
+    response = jsonify({"error": "Database connection pool exhausted, retry later"})
+    response.headers['Retry-After'] = str(max(int(config['pool_timeout']), 1))
+    return response, 503
+
+
+def init_app(app):
+    app.teardown_appcontext(close_request_db)
+    app.after_request(_pin_reads_after_write)
+    app.register_error_handler(PoolTimeoutError, handle_pool_timeout)
@@ -1,11 +1,32 @@
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DECIMAL, Date
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DECIMAL, Date, DateTime, Index, UniqueConstraint, DDL, event
 from sqlalchemy.orm import relationship
 from my_project.database import Base
 
 
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def version_columns():
+    # The mapper bumps `version` on every UPDATE and adds it to the WHERE clause,
+    # so a concurrent writer surfaces as StaleDataError instead of a lost update.
+    return (
+        Column(Integer, nullable=False, default=1, server_default="1"),
+        Column(DateTime, nullable=False, default=_utcnow, onupdate=_utcnow),
+    )
+
+
 class Movie(Base):
     __tablename__ = "movies"
+    __table_args__ = (
+        UniqueConstraint("title", "release_year", name="uq_movies_title_release_year"),
+        Index("ix_movies_release_year_movie_id", "release_year", "movie_id"),
+        Index("ix_movies_rating_movie_id", "rating", "movie_id"),
+        Index("ft_movies_title_description", "title", "description", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
 
     movie_id = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(String(60), nullable=False)
@@ -14,6 +35,9 @@ class Movie(Base):
     description = Column(Text, nullable=True)
     imdb_code = Column(String(30), nullable=False, unique=True)
     rating = Column(DECIMAL(3, 1), nullable=True)
+    version, updated_at = version_columns()
+
+    __mapper_args__ = {"version_id_col": version}
 
     movie_facts = relationship("MovieFact", back_populates="movie")
 
@@ -25,26 +49,38 @@ class Movie(Base):
 
 class Director(Base):
     __tablename__ = "directors"
+    __table_args__ = (
+        Index("ix_directors_last_name_first_name", "last_name", "first_name"),
+    )
 
     director_id = Column(Integer, primary_key=True, autoincrement=True)
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
     nationality = Column(String(100), nullable=True)
-    imdb_code = Column(String(100), nullable=False)
+    imdb_code = Column(String(100), nullable=False, unique=True)
+    version, updated_at = version_columns()
+
+    __mapper_args__ = {"version_id_col": version}
 
     movie_directors = relationship("MovieDirector", back_populates="director")
     movies = relationship("Movie", secondary="movie_directors", back_populates="directors")
 
 class Actor(Base):
     __tablename__ = "actors"
+    __table_args__ = (
+        Index("ix_actors_name_last_name", "name", "last_name"),
+    )
 
     actor_id = Column(Integer, primary_key=True, autoincrement=True)
     name = Column(String(100), nullable=False)
     birth_date = Column(Date, nullable=True)
     nationality = Column(String(100), nullable=True)
     bio = Column(Text, nullable=True)
-    imdb_code = Column(String, nullable=False)
-    last_name = Column(Integer, nullable=False)
+    imdb_code = Column(String(100), nullable=False, unique=True)
+    last_name = Column(String(100), nullable=False)
+    version, updated_at = version_columns()
+
+    __mapper_args__ = {"version_id_col": version}
 
     movie_actors = relationship("MovieActor", back_populates="actor")
     movies = relationship("Movie", secondary="movie_actors", back_populates="actors")
@@ -77,10 +113,87 @@ from sqlalchemy.orm import relationship
 
 class MovieFact(Base):
     __tablename__ = "movie_facts"
+    __table_args__ = (
+        Index("ft_movie_facts_fact_text", "fact_text", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
 
     fact_id = Column(Integer, primary_key=True, autoincrement=True)
-    movie_id = Column(Integer, ForeignKey("movies.movie_id"), nullable=False)
+    movie_id = Column(Integer, ForeignKey("movies.movie_id"), nullable=False, index=True)
     fact_text = Column(Text, nullable=False)
     source = Column(String(60), nullable=True)
 
-    movie = relationship("Movie", back_populates="movie_facts")
\ No newline at end of file
+    movie = relationship("Movie", back_populates="movie_facts")
+
+
+# Summary tables behind /stats, kept current by the service write paths and rebuilt from
+# the link tables by `flask rebuild-stats`. Rating sums are exact decimals so repeated
+# incremental updates never drift.
+
+class ReleaseYearStats(Base):
+    __tablename__ = "release_year_stats"
+
+    release_year = Column(Integer, primary_key=True, autoincrement=False)
+    movie_count = Column(Integer, nullable=False, default=0)
+    rated_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(DECIMAL(14, 1), nullable=False, default=0)
+
+
+class DirectorStats(Base):
+    __tablename__ = "director_stats"
+
+    director_id = Column(Integer, ForeignKey("directors.director_id"), primary_key=True, autoincrement=False)
+    movie_count = Column(Integer, nullable=False, default=0)
+    rated_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(DECIMAL(14, 1), nullable=False, default=0)
+
+
+class ActorStats(Base):
+    __tablename__ = "actor_stats"
+
+    actor_id = Column(Integer, ForeignKey("actors.actor_id"), primary_key=True, autoincrement=False)
+    movie_count = Column(Integer, nullable=False, default=0)
+
+
+
+class TableVersion(Base):
+    """Change counter per table, shared by every worker's response cache."""
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+# SQLite has no FULLTEXT indexes: keep an FTS5 table with one document per movie
+# (title, description and all its facts) in sync through triggers instead.
+MOVIE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS movie_search USING fts5(title, description, facts)",
+    """CREATE TRIGGER IF NOT EXISTS movie_search_movie_insert AFTER INSERT ON movies BEGIN
+        INSERT INTO movie_search(rowid, title, description, facts)
+        VALUES (new.movie_id, new.title, new.description, '');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS movie_search_movie_update AFTER UPDATE OF title, description ON movies BEGIN
+        UPDATE movie_search SET title = new.title, description = new.description WHERE rowid = new.movie_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS movie_search_movie_delete AFTER DELETE ON movies BEGIN
+        DELETE FROM movie_search WHERE rowid = old.movie_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS movie_search_fact_insert AFTER INSERT ON movie_facts BEGIN
+        UPDATE movie_search
+        SET facts = (SELECT group_concat(fact_text, ' ') FROM movie_facts WHERE movie_id = new.movie_id)
+        WHERE rowid = new.movie_id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS movie_search_fact_update AFTER UPDATE ON movie_facts BEGIN
+        UPDATE movie_search
+        SET facts = (SELECT group_concat(fact_text, ' ') FROM movie_facts WHERE movie_id = movie_search.rowid)
+        WHERE rowid IN (old.movie_id, new.movie_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS movie_search_fact_delete AFTER DELETE ON movie_facts BEGIN
+        UPDATE movie_search
+        SET facts = (SELECT group_concat(fact_text, ' ') FROM movie_facts WHERE movie_id = old.movie_id)
+        WHERE rowid = old.movie_id;
+    END""",
+]
+
+for statement in MOVIE_SEARCH_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Base.metadata, "after_drop", DDL("DROP TABLE IF EXISTS movie_search").execute_if(dialect="sqlite"))
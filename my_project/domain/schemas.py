@@ -1,5 +1,6 @@
+from operator import attrgetter
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Union, get_args, get_origin
 from datetime import date
 
 
@@ -126,4 +127,89 @@ class MovieWithFactsResponse(MovieResponse):
     movie_facts: List[MovieFactResponse] 
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class RowSerializer:
+    """Dumps ORM objects or SQLAlchemy rows the way ``schema.model_validate(obj).model_dump()`` does.
+
+    Field readers are resolved once per schema, so list endpoints skip per-row validation.
+    Only the conversions the response schemas need are compiled in: DECIMAL columns read
+    into float fields become floats, nested models and lists of them recurse.
+    """
+
+    def __init__(self, schema, fields=None):
+        self.schema = schema
+        self.fields = tuple(fields or schema.model_fields)
+        self._readers = tuple(
+            (name, _compile_reader(name, schema.model_fields[name].annotation))
+            for name in self.fields
+        )
+        self._subsets = {}
+
+    def only(self, fields=None):
+        """The serializer for a sparse fieldset, or this one when ``fields`` is None."""
+        if fields is None:
+            return self
+        subset = self._subsets.get(fields)
+        if subset is None:
+            subset = self._subsets[fields] = RowSerializer(self.schema, fields)
+        return subset
+
+    def to_dict(self, obj):
+        return {name: read(obj) for name, read in self._readers}
+
+    def many(self, objs):
+        to_dict = self.to_dict
+        return [to_dict(obj) for obj in objs]
+
+
+def _unwrap_optional(annotation):
+    if get_origin(annotation) is Union:
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _compile_reader(name, annotation):
+    annotation = _unwrap_optional(annotation)
+    read = attrgetter(name)
+
+    if annotation is float:
+        def read_float(obj):
+            value = read(obj)
+            return None if value is None else float(value)
+        return read_float
+
+    if get_origin(annotation) in (list, List):
+        (item,) = get_args(annotation)
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            nested = serializer_for(item)
+            return lambda obj: nested.many(read(obj))
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        nested = serializer_for(annotation)
+        def read_model(obj):
+            value = read(obj)
+            return None if value is None else nested.to_dict(value)
+        return read_model
+
+    return read
+
+
+_serializers = {}
+
+
+def serializer_for(schema):
+    serializer = _serializers.get(schema)
+    if serializer is None:
+        serializer = _serializers[schema] = RowSerializer(schema)
+    return serializer
+
+
+movie_serializer = serializer_for(MovieResponse)
+movie_with_facts_serializer = serializer_for(MovieWithFactsResponse)
+movie_fact_serializer = serializer_for(MovieFactResponse)
+actor_serializer = serializer_for(ActorResponse)
+director_serializer = serializer_for(DirectorResponse)
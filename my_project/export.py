@@ -0,0 +1,212 @@
+"""Full catalog dumps as NDJSON, CSV or Parquet.
+
+Base rows are read in keyset pages of ``batch_size`` rows. The association tables for
+each batch of movies are then fetched with one join per table. Every query's result is
+complete before the next one runs, so drivers that buffer whole result sets
+(mysqlconnector) still hold one batch at a time. Each batch becomes one chunk of output
+(one row group in Parquet). All reads share one session, and so one transaction.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import DECIMAL, Date, DateTime, Integer
+
+from my_project.config import get_section
+from my_project.dao import export_dao
+from my_project.database import ReadSessionLocal
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only the parquet format needs it
+    pa = pq = None
+
+settings = get_section('export', {
+    'batch_size': 2000,
+})
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+EXPORT_ENTITIES = tuple(export_dao.EXPORT_COLUMNS)
+
+CAST_KEYS = [column.key for column in export_dao.CAST_COLUMNS]
+CREW_KEYS = [column.key for column in export_dao.CREW_COLUMNS]
+MOVIE_RELATIONS = ["cast", "directors", "facts"]
+
+
+def export_keys(entity):
+    """Record keys of an entity's export, in output order."""
+    keys = [column.key for column in export_dao.EXPORT_COLUMNS[entity]]
+    return keys + MOVIE_RELATIONS if entity == "movies" else keys
+
+
+class ExportException(Exception):
+    pass
+
+
+def read_export_format(args):
+    export_format = args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        raise ExportException(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    if export_format == 'parquet' and pa is None:
+        raise ExportException("Parquet export requires pyarrow")
+    return export_format
+
+
+# -- records ------------------------------------------------------------------------------
+
+def _denormalize_movies(db, records):
+    movie_ids = [record["movie_id"] for record in records]
+    cast = export_dao.cast_for_movies(db, movie_ids)
+    crew = export_dao.crew_for_movies(db, movie_ids)
+    facts = export_dao.facts_for_movies(db, movie_ids)
+    for record in records:
+        movie_id = record["movie_id"]
+        record["cast"] = [dict(zip(CAST_KEYS, values)) for values in cast.get(movie_id, ())]
+        record["directors"] = [dict(zip(CREW_KEYS, values)) for values in crew.get(movie_id, ())]
+        record["facts"] = [fact_text for fact_text, in facts.get(movie_id, ())]
+
+
+def iter_record_batches(db, entity):
+    for rows in export_dao.iter_entity_batches(db, entity, settings['batch_size']):
+        records = [row._asdict() for row in rows]
+        if entity == "movies":
+            _denormalize_movies(db, records)
+        yield records
+
+
+# -- formats ------------------------------------------------------------------------------
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _write_ndjson(batches, entity):
+    for records in batches:
+        yield ''.join(
+            json.dumps(record, default=_json_default, ensure_ascii=False) + '\n' for record in records
+        ).encode()
+
+
+def _csv_value(value):
+    # Nested cast, directors and facts are embedded as JSON in a single cell.
+    if isinstance(value, list):
+        return json.dumps(value, default=_json_default, ensure_ascii=False)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _write_csv(batches, entity):
+    header = export_keys(entity)
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(header)
+    # Written up front, so an empty table still exports a header row.
+    yield buffer.getvalue().encode()
+    for records in batches:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([_csv_value(record[key]) for key in header] for record in records)
+        yield buffer.getvalue().encode()
+
+
+def _arrow_type(column):
+    column_type = column.type
+    if isinstance(column_type, DECIMAL):
+        return pa.decimal128(column_type.precision, column_type.scale)
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp('us')
+    if isinstance(column_type, Date):
+        return pa.date32()
+    return pa.string()
+
+
+def arrow_schema(entity):
+    fields = [pa.field(column.key, _arrow_type(column)) for column in export_dao.EXPORT_COLUMNS[entity]]
+    if entity == "movies":
+        fields += [
+            pa.field("cast", pa.list_(pa.struct(
+                [pa.field(column.key, _arrow_type(column)) for column in export_dao.CAST_COLUMNS]
+            ))),
+            pa.field("directors", pa.list_(pa.struct(
+                [pa.field(column.key, _arrow_type(column)) for column in export_dao.CREW_COLUMNS]
+            ))),
+            pa.field("facts", pa.list_(pa.string())),
+        ]
+    return pa.schema(fields)
+
+
+class _ChunkSink:
+    """Append-only file object for the Parquet writer, drained after every row group."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def writable(self):
+        return True
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _write_parquet(batches, entity):
+    schema = arrow_schema(entity)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        for records in batches:
+            if records:
+                writer.write_table(pa.Table.from_pylist(records, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    # The footer is only written on close.
+    yield sink.drain()
+
+
+WRITERS = {
+    'ndjson': _write_ndjson,
+    'csv': _write_csv,
+    'parquet': _write_parquet,
+}
+
+
+def iter_export(entity, export_format):
+    """Bytes of a full export, produced one batch at a time."""
+    db = ReadSessionLocal()
+    try:
+        batches = iter_record_batches(db, entity)
+        for chunk in WRITERS[export_format](batches, entity):
+            if chunk:
+                yield chunk
+    finally:
+        db.close()
@@ -0,0 +1,17 @@
+class FieldsetException(Exception):
+    pass
+
+
+def read_fields(args, serializer):
+    """Parse ``?fields=title,rating`` against the fields a response serializer knows about."""
+    raw = args.get('fields')
+    if raw is None:
+        return None
+
+    fields = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    if not fields:
+        raise FieldsetException("fields must name at least one field")
+    unknown = [name for name in fields if name not in serializer.fields]
+    if unknown:
+        raise FieldsetException(f"Unknown fields: {', '.join(unknown)}")
+    return fields
@@ -0,0 +1,337 @@
+"""In-memory actor collaboration graph.
+
+movie_actors is kept as two CSR adjacency structures (actor -> movies, movie -> actors) in
+compact integer arrays. Committed link changes are applied as a small overlay on top of
+them, the overlay is folded back into fresh arrays once it grows, and the whole graph is
+rebuilt from the database in the background every ``rebuild_seconds`` to pick up changes
+made by other processes or by bulk SQL.
+"""
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from my_project.config import get_section
+from my_project.dao import graph_dao
+from my_project.database import ReadSessionLocal
+from my_project.domain.models import Actor, Movie, MovieActor
+
+settings = get_section('graph', {
+    'rebuild_seconds': 900,
+    'compact_after': 10000,
+    'max_degrees': 6,
+    'max_hops': 3,
+})
+
+logger = logging.getLogger("my_project.graph")
+
+
+class GraphNotReadyException(Exception):
+    pass
+
+
+class ActorPath(NamedTuple):
+    actor_ids: List[int]
+    # movie_ids[i] links actor_ids[i] and actor_ids[i + 1].
+    movie_ids: List[int]
+
+
+class Adjacency:
+    """CSR adjacency: the neighbours of keys[i] are values[offsets[i]:offsets[i + 1]]."""
+
+    def __init__(self, keys=None, offsets=None, values=None):
+        self.keys = keys if keys is not None else array('q')
+        self.offsets = offsets if offsets is not None else array('q', [0])
+        self.values = values if values is not None else array('q')
+
+    @classmethod
+    def from_sorted_pairs(cls, pairs):
+        keys, offsets, values = array('q'), array('q'), array('q')
+        for key, value in pairs:
+            if not keys or keys[-1] != key:
+                keys.append(key)
+                offsets.append(len(values))
+            values.append(value)
+        offsets.append(len(values))
+        return cls(keys, offsets, values)
+
+    def get(self, key):
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.values[self.offsets[i]:self.offsets[i + 1]]
+        return ()
+
+    def __len__(self):
+        return len(self.values)
+
+
+class OverlaidAdjacency:
+    """A CSR base plus the links added and removed since it was built."""
+
+    def __init__(self, base: Adjacency):
+        self.base = base
+        self.added = {}
+        self.removed = {}
+        self.pending = 0
+
+    def neighbours(self, key):
+        base = self.base.get(key)
+        added, removed = self.added.get(key), self.removed.get(key)
+        if not added and not removed:
+            return base
+        merged = [value for value in base if not removed or value not in removed]
+        if added:
+            merged.extend(added)
+        return merged
+
+    # Both are idempotent: a change replayed onto a graph that already holds it is a no-op.
+    def add(self, key, value):
+        removed = self.removed.get(key)
+        if removed and value in removed:
+            removed.discard(value)
+        elif value not in self.base.get(key):
+            self.added.setdefault(key, set()).add(value)
+        else:
+            return
+        self.pending += 1
+
+    def discard(self, key, value):
+        added = self.added.get(key)
+        if added and value in added:
+            added.discard(value)
+        elif value in self.base.get(key):
+            self.removed.setdefault(key, set()).add(value)
+        else:
+            return
+        self.pending += 1
+
+    def compacted(self):
+        keys = sorted(set(self.base.keys).union(self.added))
+        pairs = ((key, value) for key in keys for value in sorted(self.neighbours(key)))
+        return OverlaidAdjacency(Adjacency.from_sorted_pairs(pairs))
+
+
+class CollaborationGraph:
+    def __init__(self, session_factory=ReadSessionLocal):
+        self.session_factory = session_factory
+        self._lock = threading.RLock()
+        self._actor_movies: Optional[OverlaidAdjacency] = None
+        self._movie_actors: Optional[OverlaidAdjacency] = None
+        self._built_at = None
+        self._rebuilding = False
+        # Changes committed while a rebuild was reading the tables, replayed onto its result.
+        self._changes_during_rebuild = []
+
+    # -- building -----------------------------------------------------------------------
+
+    def _load(self):
+        db = self.session_factory()
+        try:
+            actor_movies = Adjacency.from_sorted_pairs(graph_dao.iter_cast_links(db, by="actor"))
+            movie_actors = Adjacency.from_sorted_pairs(graph_dao.iter_cast_links(db, by="movie"))
+        finally:
+            db.close()
+        return OverlaidAdjacency(actor_movies), OverlaidAdjacency(movie_actors)
+
+    def rebuild(self):
+        started = time.perf_counter()
+        with self._lock:
+            self._changes_during_rebuild = []
+        actor_movies, movie_actors = self._load()
+        with self._lock:
+            for change in self._changes_during_rebuild:
+                self._apply(actor_movies, movie_actors, *change)
+            self._actor_movies, self._movie_actors = actor_movies, movie_actors
+            self._built_at = time.monotonic()
+            self._changes_during_rebuild = []
+            self._rebuilding = False
+        logger.info("actor graph rebuilt: %d links in %.2fs", len(actor_movies.base), time.perf_counter() - started)
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception("actor graph rebuild failed")
+            with self._lock:
+                self._rebuilding = False
+
+    def _ensure_built(self):
+        """Start a rebuild when the graph is missing or stale; raise until the first one is done.
+
+        Builds always run on a background thread: reading the link table can take a while,
+        and committing writers must not wait on it to apply their changes.
+        """
+        built_at = self._built_at
+        if built_at is None or time.monotonic() - built_at > settings['rebuild_seconds']:
+            with self._lock:
+                start = not self._rebuilding
+                self._rebuilding = True
+            if start:
+                threading.Thread(target=self._rebuild_in_background, name="actor-graph-rebuild", daemon=True).start()
+        if self._actor_movies is None:
+            raise GraphNotReadyException("Actor graph is still being built")
+
+    # -- incremental changes ------------------------------------------------------------
+
+    @staticmethod
+    def _apply(actor_movies, movie_actors, kind, movie_id, actor_id):
+        if kind == "link":
+            actor_movies.add(actor_id, movie_id)
+            movie_actors.add(movie_id, actor_id)
+        elif kind == "unlink":
+            actor_movies.discard(actor_id, movie_id)
+            movie_actors.discard(movie_id, actor_id)
+        elif kind == "drop_actor":
+            for linked_movie in list(actor_movies.neighbours(actor_id)):
+                actor_movies.discard(actor_id, linked_movie)
+                movie_actors.discard(linked_movie, actor_id)
+        elif kind == "drop_movie":
+            for linked_actor in list(movie_actors.neighbours(movie_id)):
+                movie_actors.discard(movie_id, linked_actor)
+                actor_movies.discard(linked_actor, movie_id)
+
+    def apply_changes(self, changes):
+        with self._lock:
+            if self._rebuilding:
+                self._changes_during_rebuild.extend(changes)
+            if self._actor_movies is None:
+                return
+            for change in changes:
+                self._apply(self._actor_movies, self._movie_actors, *change)
+            if self._actor_movies.pending >= settings['compact_after']:
+                self._actor_movies = self._actor_movies.compacted()
+                self._movie_actors = self._movie_actors.compacted()
+
+    # -- queries ------------------------------------------------------------------------
+
+    def _expand(self, frontier, parents, seen_movies, other_parents):
+        """One actor-to-actor step: actor -> movies -> co-stars. Returns (next frontier, meeting actor)."""
+        next_frontier = []
+        for actor_id in frontier:
+            for movie_id in self._actor_movies.neighbours(actor_id):
+                if movie_id in seen_movies:
+                    continue
+                seen_movies.add(movie_id)
+                for costar_id in self._movie_actors.neighbours(movie_id):
+                    if costar_id in parents:
+                        continue
+                    parents[costar_id] = (actor_id, movie_id)
+                    if other_parents is not None and costar_id in other_parents:
+                        return next_frontier, costar_id
+                    next_frontier.append(costar_id)
+        return next_frontier, None
+
+    @staticmethod
+    def _walk(actor_id, parents):
+        actors, movies = [], []
+        while parents[actor_id] is not None:
+            previous, movie_id = parents[actor_id]
+            actors.append(previous)
+            movies.append(movie_id)
+            actor_id = previous
+        return actors, movies
+
+    def shortest_path(self, source: int, target: int, max_degrees: int = None) -> Optional[ActorPath]:
+        """Bidirectional BFS, always expanding the smaller frontier."""
+        max_degrees = max_degrees or settings['max_degrees']
+        if source == target:
+            return ActorPath([source], [])
+
+        self._ensure_built()
+        with self._lock:
+            forward, backward = {source: None}, {target: None}
+            forward_movies, backward_movies = set(), set()
+            forward_frontier, backward_frontier = [source], [target]
+            meeting = None
+            for _ in range(max_degrees):
+                if not forward_frontier or not backward_frontier:
+                    break
+                if len(forward_frontier) <= len(backward_frontier):
+                    forward_frontier, meeting = self._expand(forward_frontier, forward, forward_movies, backward)
+                else:
+                    backward_frontier, meeting = self._expand(backward_frontier, backward, backward_movies, forward)
+                if meeting is not None:
+                    break
+            if meeting is None:
+                return None
+
+            to_source, movies_to_source = self._walk(meeting, forward)
+            to_target, movies_to_target = self._walk(meeting, backward)
+        return ActorPath(
+            list(reversed(to_source)) + [meeting] + to_target,
+            list(reversed(movies_to_source)) + movies_to_target,
+        )
+
+    def within_hops(self, source: int, hops: int):
+        """{actor_id: hops} for every actor at most ``hops`` co-star steps away from ``source``."""
+        self._ensure_built()
+        with self._lock:
+            parents, seen_movies = {source: None}, set()
+            distances, frontier = {}, [source]
+            for hop in range(1, hops + 1):
+                frontier, _ = self._expand(frontier, parents, seen_movies, None)
+                if not frontier:
+                    break
+                distances.update((actor_id, hop) for actor_id in frontier)
+        return distances
+
+    def stats(self):
+        with self._lock:
+            if self._actor_movies is None:
+                return {"built": False}
+            return {
+                "built": True,
+                "actors": len(self._actor_movies.base.keys),
+                "movies": len(self._movie_actors.base.keys),
+                "links": len(self._actor_movies.base),
+                "pending_changes": self._actor_movies.pending,
+                "age_seconds": round(time.monotonic() - self._built_at, 1),
+            }
+
+
+actor_graph = CollaborationGraph()
+
+
+# Link changes are collected per session and only reach the graph once they commit.
+
+def _record(target, change):
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("actor_graph_changes", []).append(change)
+
+
+@event.listens_for(MovieActor, "after_insert")
+def _link_inserted(mapper, connection, target):
+    _record(target, ("link", target.movie_id, target.actor_id))
+
+
+@event.listens_for(MovieActor, "after_delete")
+def _link_deleted(mapper, connection, target):
+    _record(target, ("unlink", target.movie_id, target.actor_id))
+
+
+@event.listens_for(Actor, "after_delete")
+def _actor_deleted(mapper, connection, target):
+    _record(target, ("drop_actor", None, target.actor_id))
+
+
+@event.listens_for(Movie, "after_delete")
+def _movie_deleted(mapper, connection, target):
+    _record(target, ("drop_movie", target.movie_id, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session):
+    changes = session.info.pop("actor_graph_changes", None)
+    if changes:
+        actor_graph.apply_changes(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop("actor_graph_changes", None)
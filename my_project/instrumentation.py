@@ -0,0 +1,103 @@
+import json
+import logging
+import time
+
+from flask import Response, g, request
+
+from my_project.config import get_section
+from my_project.database import QueryStats, pool_stats
+from my_project.metrics import COUNT_BUCKETS, Counter, Gauge, Histogram, registry
+
+settings = get_section('instrumentation', {
+    'repeated_statement_threshold': 5,
+    'log_requests': True,
+})
+
+logger = logging.getLogger("my_project.requests")
+
+request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Time spent handling a request.", ("endpoint", "method", "status")
+))
+db_duration = registry.register(Histogram(
+    "db_time_per_request_seconds", "Time spent in database round trips per request.", ("endpoint",)
+))
+db_queries = registry.register(Histogram(
+    "db_queries_per_request", "SQL statements executed per request.", ("endpoint",), buckets=COUNT_BUCKETS
+))
+db_rows_fetched = registry.register(Histogram(
+    "db_rows_fetched_per_request", "Result rows read from the database per request.", ("endpoint",),
+    buckets=(1, 10, 100, 1000, 10000, 100000)
+))
+db_rows_affected = registry.register(Histogram(
+    "db_rows_affected_per_request", "Rows inserted, updated or deleted per request.", ("endpoint",),
+    buckets=(1, 10, 100, 1000, 10000, 100000)
+))
+repeated_statements = registry.register(Counter(
+    "db_repeated_statement_requests_total",
+    "Requests that ran one SQL statement at least repeated_statement_threshold times (likely N+1).",
+    ("endpoint",)
+))
+registry.register(Gauge(
+    "db_pool_checked_out", "Connections currently checked out of the pool.",
+    callback=lambda: pool_stats()["checked_out"]
+))
+registry.register(Gauge(
+    "db_pool_overflow", "Overflow connections currently open.",
+    callback=lambda: pool_stats()["overflow"]
+))
+
+
+def _start_request():
+    g.request_started = time.perf_counter()
+    g.query_stats = QueryStats()
+
+
+def _finish_request(response):
+    stats = g.get('query_stats')
+    started = g.get('request_started')
+    if stats is None or started is None:
+        return response
+
+    endpoint = request.endpoint or "unknown"
+    total = time.perf_counter() - started
+    repeated = stats.repeated(settings['repeated_statement_threshold'])
+
+    request_duration.observe(total, endpoint, request.method, str(response.status_code))
+    db_duration.observe(stats.duration, endpoint)
+    db_queries.observe(stats.count, endpoint)
+    db_rows_fetched.observe(stats.rows_fetched, endpoint)
+    db_rows_affected.observe(stats.rows_affected, endpoint)
+    if repeated:
+        repeated_statements.inc(endpoint)
+
+    response.headers.add(
+        'Server-Timing',
+        f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries, {stats.rows_fetched} rows", app;dur={total * 1000:.2f}'
+    )
+
+    if settings['log_requests']:
+        logger.info(json.dumps({
+            "endpoint": endpoint,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(total * 1000, 3),
+            "db_queries": stats.count,
+            "db_time_ms": round(stats.duration * 1000, 3),
+            "db_rows_fetched": stats.rows_fetched,
+            "db_rows_affected": stats.rows_affected,
+            "repeated_statements": [
+                {"statement": statement, "count": n} for statement, n in repeated.items()
+            ],
+        }))
+    return response
+
+
+def metrics_endpoint():
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app):
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint)
@@ -0,0 +1,69 @@
+from my_project.config import get_section
+
+settings = get_section('lookups', {
+    'max_imdb_batch_size': 5000,
+    'max_id_batch_size': 1000,
+})
+
+
+class LookupRequestException(Exception):
+    pass
+
+
+def read_imdb_codes(payload):
+    codes = payload.get('imdb_codes') if isinstance(payload, dict) else None
+    if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+        raise LookupRequestException("Expected a JSON object with an 'imdb_codes' list of strings")
+    if len(codes) > settings['max_imdb_batch_size']:
+        raise LookupRequestException(f"At most {settings['max_imdb_batch_size']} IMDb codes per request")
+    return list(dict.fromkeys(codes))
+
+
+def _checked_ids(ids):
+    if len(ids) > settings['max_id_batch_size']:
+        raise LookupRequestException(f"At most {settings['max_id_batch_size']} ids per request")
+    return list(dict.fromkeys(ids))
+
+
+def _checked_includes(includes, allowed):
+    unknown = [name for name in includes if name not in allowed]
+    if unknown:
+        raise LookupRequestException(f"Cannot include '{unknown[0]}'; expected one of: {', '.join(allowed)}")
+    return tuple(dict.fromkeys(includes))
+
+
+def read_includes(args, allowed_includes):
+    """Relationship names from ``?include=a,b``, in request order."""
+    includes = [part.strip() for part in args.get('include', '').split(',') if part.strip()]
+    return _checked_includes(includes, allowed_includes)
+
+
+def read_id_args(args, allowed_includes):
+    """(ids, includes) from ``?ids=1,2,3&include=a,b``."""
+    try:
+        ids = [int(part) for part in args.get('ids', '').split(',') if part.strip()]
+    except ValueError:
+        raise LookupRequestException("ids must be a comma-separated list of integers")
+    return _checked_ids(ids), read_includes(args, allowed_includes)
+
+
+def read_id_payload(payload, allowed_includes):
+    """(ids, includes) from ``{"ids": [...], "include": [...]}``."""
+    ids = payload.get('ids') if isinstance(payload, dict) else None
+    # bool is an int subclass, but true/false are never ids.
+    if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        raise LookupRequestException("Expected a JSON object with an 'ids' list of integers")
+    includes = payload.get('include', [])
+    if not isinstance(includes, list) or not all(isinstance(name, str) for name in includes):
+        raise LookupRequestException("'include' must be a list of strings")
+    return _checked_ids(ids), _checked_includes(includes, allowed_includes)
+
+
+def in_request_order(ids, found):
+    """[found[id] or None] for each requested id, plus the ids that were not found."""
+    return [found.get(i) for i in ids], [i for i in ids if i not in found]
+
+
+def batch_body(items, not_found, to_dict):
+    """Batch-get response: one entry per requested id, null where ``not_found`` lists the id."""
+    return {"items": [to_dict(item) if item is not None else None for item in items], "not_found": not_found}
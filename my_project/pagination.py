@@ -0,0 +1,158 @@
+import base64
+import json
+from decimal import Decimal
+from typing import Any, List, NamedTuple, Optional
+
+from sqlalchemy import and_, or_
+
+from my_project.config import get_section
+
+settings = get_section('pagination', {
+    'default_page_size': 100,
+    'max_page_size': 500,
+})
+
+
+class PaginationException(Exception):
+    pass
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+
+
+class PageRequest(NamedTuple):
+    limit: int
+    cursor: Optional[str]
+    sort_by: str
+    descending: bool
+
+
+def clamp_limit(limit):
+    if limit is None:
+        return settings['default_page_size']
+    return max(1, min(int(limit), settings['max_page_size']))
+
+
+def read_page_args(args, sortable, default_sort):
+    limit = clamp_limit(args.get('limit', type=int))
+    sort_by = args.get('sort', default_sort)
+    if sort_by not in sortable:
+        raise PaginationException(f"Cannot sort by '{sort_by}'")
+
+    order = args.get('order', 'asc')
+    if order not in ('asc', 'desc'):
+        raise PaginationException("order must be 'asc' or 'desc'")
+
+    return PageRequest(limit, args.get('cursor'), sort_by, order == 'desc')
+
+
+def page_headers(page: Page):
+    if page.next_cursor is None:
+        return {}
+    return {'X-Next-Cursor': page.next_cursor}
+
+
+def encode_cursor(sort_by: str, descending: bool, value, pk: int):
+    if isinstance(value, Decimal):
+        value = str(value)
+    payload = json.dumps({'s': sort_by, 'd': descending, 'v': value, 'k': pk}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str, sort_by: str, descending: bool):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value, pk = payload['v'], int(payload['k'])
+        same_order = payload['s'] == sort_by and payload['d'] == descending
+    except (ValueError, KeyError, TypeError):
+        raise PaginationException("Invalid cursor")
+    if not same_order:
+        raise PaginationException("Cursor does not match the requested sort order")
+    return value, pk
+
+
+def _after(sort_column, pk_column, descending, value, pk):
+    # NULLs sort first ascending and last descending on both MySQL and SQLite.
+    if sort_column is pk_column:
+        return pk_column < pk if descending else pk_column > pk
+
+    if value is None:
+        if descending:
+            return and_(sort_column.is_(None), pk_column < pk)
+        return or_(sort_column.isnot(None), and_(sort_column.is_(None), pk_column > pk))
+
+    try:
+        value = sort_column.type.python_type(value)
+    except (TypeError, ValueError, ArithmeticError):
+        raise PaginationException("Invalid cursor")
+    if descending:
+        return or_(
+            sort_column < value,
+            and_(sort_column == value, pk_column < pk),
+            sort_column.is_(None),
+        )
+    return or_(sort_column > value, and_(sort_column == value, pk_column > pk))
+
+
+def keyset_query(query, sort_column, pk_column, page_request: PageRequest):
+    descending = page_request.descending
+    if page_request.cursor:
+        value, pk = decode_cursor(page_request.cursor, page_request.sort_by, descending)
+        query = query.where(_after(sort_column, pk_column, descending, value, pk))
+
+    if sort_column is pk_column:
+        order = [pk_column.desc() if descending else pk_column]
+    else:
+        order = [sort_column.desc(), pk_column.desc()] if descending else [sort_column, pk_column]
+
+    return query.order_by(*order).limit(page_request.limit + 1)
+
+
+def build_page(rows, sort_column, pk_column, page_request: PageRequest):
+    if len(rows) <= page_request.limit:
+        return Page(rows, None)
+
+    items = rows[:page_request.limit]
+    last = items[-1]
+    next_cursor = encode_cursor(
+        page_request.sort_by,
+        page_request.descending,
+        getattr(last, sort_column.key),
+        getattr(last, pk_column.key),
+    )
+    return Page(items, next_cursor)
+
+
+def paginate(db, query, sort_column, pk_column, page_request: PageRequest):
+    rows = db.scalars(keyset_query(query, sort_column, pk_column, page_request)).all()
+    return build_page(rows, sort_column, pk_column, page_request)
+
+
+def paginate_rows(db, query, sort_column, pk_column, page_request: PageRequest):
+    """paginate() for column selects; the selected columns must include the sort and pk columns."""
+    rows = db.execute(keyset_query(query, sort_column, pk_column, page_request)).all()
+    return build_page(rows, sort_column, pk_column, page_request)
+
+
+def first_page(sort_by: str, limit=None):
+    return PageRequest(clamp_limit(limit), None, sort_by, False)
+
+
+def iter_pages(fetch_page, sort_by: str, chunk_size: int):
+    """The items of every page of a keyset-paginated query, one list and one bounded query per page."""
+    page_request = PageRequest(chunk_size, None, sort_by, False)
+    while True:
+        page = fetch_page(page_request)
+        yield page.items
+        if page.next_cursor is None:
+            return
+        page_request = page_request._replace(cursor=page.next_cursor)
+
+
+def iter_all(fetch_page, sort_by: str, chunk_size: int):
+    """Walk every page of a keyset-paginated query, one bounded query per chunk."""
+    for items in iter_pages(fetch_page, sort_by, chunk_size):
+        yield from items
@@ -0,0 +1,167 @@
+"""Finished-response cache for hot read endpoints.
+
+A cached entry holds the response body, already compressed for every supported content
+coding, together with the versions of the tables it was built from (see
+my_project.table_versions). An entry is served only while none of those tables have changed.
+"""
+import gzip
+import threading
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import g, make_response, request
+from werkzeug.http import quote_etag, unquote_etag
+
+from my_project.cache import LRUCache, _MISSING
+from my_project.config import get_section
+from my_project.table_versions import table_versions
+
+try:
+    import brotli
+except ImportError:  # optional: without it, responses are only pre-compressed with gzip
+    brotli = None
+
+settings = get_section('response_cache', {
+    'enabled': True,
+    'max_entries': 1000,
+    'ttl_seconds': 300,
+    'min_compress_bytes': 1024,
+    'gzip_level': 6,
+    'brotli_quality': 5,
+    'coalesce_timeout_seconds': 10,
+})
+
+# Headers that belong to one exchange, not to the cached representation.
+UNCACHED_HEADERS = {'Content-Length', 'Content-Encoding', 'Set-Cookie', 'Vary'}
+
+
+def _compress(body):
+    encoded = {'identity': body}
+    if len(body) >= settings['min_compress_bytes']:
+        encoded['gzip'] = gzip.compress(body, compresslevel=settings['gzip_level'])
+        if brotli is not None:
+            encoded['br'] = brotli.compress(body, quality=settings['brotli_quality'])
+    return encoded
+
+
+def _negotiate(encoded):
+    accepted = request.accept_encodings
+    for coding in ('br', 'gzip'):
+        if coding in encoded and accepted[coding]:
+            return coding
+    return 'identity'
+
+
+def _variant_etag(etag, coding):
+    # Each content coding is its own representation, so it gets its own strong ETag.
+    if etag is None or coding == 'identity':
+        return etag
+    value, weak = unquote_etag(etag)
+    return quote_etag(f"{value}-{coding}", weak)
+
+
+class ResponseCache:
+    def __init__(self, store: LRUCache, enabled=True):
+        self.store = store
+        self.enabled = enabled
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    @staticmethod
+    def _key():
+        return f"{request.endpoint}?{urlencode(sorted(request.args.items(multi=True)))}"
+
+    def _lookup(self, key, versions):
+        entry = self.store.get(key)
+        if entry is _MISSING or entry["versions"] != versions:
+            return None
+        return entry
+
+    def _build(self, view, args, kwargs, versions):
+        # Fill from the primary: an entry read from a lagging replica would outlive the lag.
+        g.read_primary = True
+        response = make_response(view(*args, **kwargs))
+        if response.status_code != 200 or response.is_streamed or 'Set-Cookie' in response.headers:
+            return response, None
+        headers = [(name, value) for name, value in response.headers if name not in UNCACHED_HEADERS]
+        return response, {"versions": versions, "headers": headers, "bodies": _compress(response.get_data())}
+
+    def _serve(self, entry):
+        coding = _negotiate(entry["bodies"])
+        headers = dict(entry["headers"])
+        headers['ETag'] = _variant_etag(headers.get('ETag'), coding)
+        if headers['ETag'] is None:
+            del headers['ETag']
+        headers['Vary'] = 'Accept-Encoding'
+        if coding != 'identity':
+            headers['Content-Encoding'] = coding
+
+        etag = headers.get('ETag')
+        if etag and request.if_none_match and request.if_none_match.contains_weak(unquote_etag(etag)[0]):
+            return make_response(("", 304, {name: headers[name] for name in ('ETag', 'Vary') if name in headers}))
+        return make_response((entry["bodies"][coding], 200, headers))
+
+    def get_or_build(self, tables, view, args, kwargs):
+        key = self._key()
+        # Captured before the view reads anything: a write committed mid-build leaves the
+        # entry tagged with the older versions, so the next request rebuilds it.
+        versions = table_versions.current(tables)
+        if versions is None:
+            return make_response(view(*args, **kwargs))
+        entry = self._lookup(key, versions)
+        if entry is not None:
+            return self._serve(entry)
+
+        with self._lock:
+            waiting = self._inflight.get(key)
+            if waiting is None:
+                done = self._inflight[key] = threading.Event()
+        if waiting is not None:
+            # Another request is already rebuilding this key; share its result.
+            waiting.wait(settings['coalesce_timeout_seconds'])
+            entry = self._lookup(key, versions)
+            if entry is not None:
+                self.coalesced += 1
+                return self._serve(entry)
+            return make_response(view(*args, **kwargs))
+
+        try:
+            response, entry = self._build(view, args, kwargs, versions)
+            if entry is None:
+                return response
+            self.store.set(key, entry)
+            return self._serve(entry)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            done.set()
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "brotli": brotli is not None,
+            "coalesced": self.coalesced,
+            **self.store.stats(),
+        }
+
+
+response_cache = ResponseCache(
+    LRUCache(settings['max_entries'], settings['ttl_seconds']),
+    enabled=settings['enabled'],
+)
+
+
+def cached_response(*tables):
+    """Serve GETs of the decorated view from the response cache while ``tables`` are unchanged.
+
+    Goes above ``with_db_session`` so a hit never opens a session.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not response_cache.enabled or request.method != 'GET':
+                return view(*args, **kwargs)
+            return response_cache.get_or_build(tables, view, args, kwargs)
+        return wrapper
+    return decorator
@@ -1,10 +1,16 @@
 
 from sqlalchemy.orm import Session
 from my_project.dao import actor_dao, movie_dao
+from my_project.service import stats_service
 from my_project.domain.models import Actor, MovieActor
 from my_project.dao.actor_dao import get_actor
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
+from my_project.bulk_import import import_records
+from my_project.conditional import check_row_version
+from my_project.lookups import in_request_order
+from my_project.domain.schemas import ActorCreate
+from my_project.graph import actor_graph
 class ActorNotFoundException(Exception):
     pass
 
@@ -13,11 +19,23 @@ class ActorAlreadyExistsException(Exception):
 
 
 def create_new_actor(db: Session, actor_schema):
-    existing_actor = actor_dao.get_actor_by_name(db, actor_schema.name)
-    if existing_actor:
+    new_actor = actor_dao.create_actor(
+        db, actor_schema, before_commit=lambda row: stats_service.actors_created(db, [row["actor_id"]])
+    )
+    if new_actor is None:
         raise ActorAlreadyExistsException("Actor already exists")
-    
-    return actor_dao.create_actor(db, actor_schema)
+    return new_actor
+
+
+def _insert_actors(db: Session, actors):
+    return actor_dao.bulk_insert_actors(db, actors, before_commit=lambda ids: stats_service.actors_created(db, ids))
+
+
+def bulk_create_actors(db: Session, records):
+    return import_records(
+        db, records, ActorCreate, lambda actor: (("imdb", actor.imdb_code),),
+        actor_dao.find_existing_actor_keys, _insert_actors
+    )
 
 
 def get_actor_by_id(db: Session, actor_id: int):
@@ -27,17 +45,56 @@ def get_actor_by_id(db: Session, actor_id: int):
     return actor
 
 
-def get_all_actors_service(db: Session, skip=0, limit=100):
-    return actor_dao.get_all_actors(db, skip, limit)
+def get_actor_by_imdb_code(db: Session, imdb_code: str):
+    actor = actor_dao.get_actor_by_imdb(db, imdb_code)
+    if not actor:
+        raise ActorNotFoundException("Actor not found")
+    return actor
+
+
+def resolve_actor_imdb_codes(db: Session, imdb_codes):
+    found = actor_dao.resolve_actor_imdb_codes(db, imdb_codes) if imdb_codes else {}
+    return {code: found.get(code) for code in imdb_codes}
+
+
+def get_actors_batch(db: Session, actor_ids, include=()):
+    found = actor_dao.get_actors_by_ids(db, actor_ids, include) if actor_ids else {}
+    return in_request_order(actor_ids, found)
+
+
+def get_all_actors_service(db: Session, page_request=None):
+    return actor_dao.get_all_actors(db, page_request)
+
+
+def iter_all_actors(db: Session, chunk_size):
+    return actor_dao.iter_actors(db, chunk_size)
 
 
-def update_existing_actor(db: Session, actor_id: int, actor_update):
+def get_all_actor_rows_service(db: Session, page_request=None, fields=None):
+    return actor_dao.get_all_actor_rows(db, page_request, fields)
+
+
+def iter_all_actor_rows(db: Session, chunk_size, fields=None):
+    return actor_dao.iter_actor_rows(db, chunk_size, fields)
+
+
+def get_actor_version(db: Session, actor_id: int):
+    return actor_dao.get_actor_version(db, actor_id)
+
+
+def get_actors_page_version(db: Session, page_request=None):
+    return actor_dao.get_actors_page_version(db, page_request)
+
+
+def update_existing_actor(db: Session, actor_id: int, actor_update, expected_version=None):
     actor = get_actor_by_id(db, actor_id)
+    check_row_version(actor.version, expected_version)
     return actor_dao.update_actor(db, actor, actor_update)
 
 
 def delete_existing_actor(db: Session, actor_id: int):
     actor = get_actor_by_id(db, actor_id)
+    stats_service.actor_deleting(db, actor_id)
     actor_dao.delete_actor(db, actor)
 
 
@@ -56,3 +113,31 @@ def get_actor_movies_service(db, actor_id: int):
         raise ActorNotFoundException(f"Actor with id {actor_id} not found")
 
     return actor
+
+
+def _require_actors(db: Session, actor_ids):
+    found = actor_dao.get_actors_by_ids(db, actor_ids)
+    missing = [actor_id for actor_id in actor_ids if actor_id not in found]
+    if missing:
+        raise ActorNotFoundException(f"Actor with id {missing[0]} not found")
+    return found
+
+
+def get_actor_path_service(db: Session, source_id: int, target_id: int):
+    """Shortest co-star chain between two actors as (actors, movies), or None when there is none.
+
+    movies[i] is a movie actors[i] and actors[i + 1] appeared in together.
+    """
+    _require_actors(db, [source_id, target_id])
+    path = actor_graph.shortest_path(source_id, target_id)
+    if path is None:
+        return None
+    actors = actor_dao.get_actors_by_ids(db, path.actor_ids)
+    movies = movie_dao.get_movies_by_ids(db, path.movie_ids) if path.movie_ids else {}
+    return [actors[i] for i in path.actor_ids], [movies[i] for i in path.movie_ids]
+
+
+def get_costars_service(db: Session, actor_id: int, hops: int):
+    """{actor_id: hops} for every actor within ``hops`` co-star steps of ``actor_id``."""
+    _require_actors(db, [actor_id])
+    return actor_graph.within_hops(actor_id, hops)
@@ -1,7 +1,12 @@
 from sqlalchemy.orm import Session
 from my_project.dao import director_dao, movie_dao
+from my_project.service import stats_service
 from my_project.domain.models import Director, Movie
 from my_project.database import get_db
+from my_project.bulk_import import import_records
+from my_project.conditional import check_row_version
+from my_project.lookups import in_request_order
+from my_project.domain.schemas import DirectorCreate
 
 class DirectorNotFoundException(Exception):
     pass
@@ -10,17 +15,25 @@ class DirectorAlreadyExistsException(Exception):
     pass
 
 def create_new_director(db: Session, director_schema):
-    existing_director = director_dao.get_director_by_name(
-        db, 
-        director_schema.first_name, 
-        director_schema.last_name,
-        director_schema.imdb_code, 
-        director_schema.nationality
+    new_director = director_dao.create_director(
+        db, director_schema, before_commit=lambda row: stats_service.directors_created(db, [row["director_id"]])
     )
-    if existing_director:
+    if new_director is None:
         raise DirectorAlreadyExistsException("Director already exists")
-    
-    return director_dao.create_director(db, director_schema)
+    return new_director
+
+
+def _insert_directors(db: Session, directors):
+    return director_dao.bulk_insert_directors(
+        db, directors, before_commit=lambda ids: stats_service.directors_created(db, ids)
+    )
+
+
+def bulk_create_directors(db: Session, records):
+    return import_records(
+        db, records, DirectorCreate, lambda director: (("imdb", director.imdb_code),),
+        director_dao.find_existing_director_keys, _insert_directors
+    )
 
 
 def get_director_by_id(db: Session, director_id: int):
@@ -30,18 +43,56 @@ def get_director_by_id(db: Session, director_id: int):
     return director
 
 
+def get_director_by_imdb_code(db: Session, imdb_code: str):
+    director = director_dao.get_director_by_imdb(db, imdb_code)
+    if not director:
+        raise DirectorNotFoundException("Director not found")
+    return director
+
+
+def resolve_director_imdb_codes(db: Session, imdb_codes):
+    found = director_dao.resolve_director_imdb_codes(db, imdb_codes) if imdb_codes else {}
+    return {code: found.get(code) for code in imdb_codes}
+
+
+def get_directors_batch(db: Session, director_ids, include=()):
+    found = director_dao.get_directors_by_ids(db, director_ids, include) if director_ids else {}
+    return in_request_order(director_ids, found)
+
+
+def get_all_directors_service(db, page_request=None):
+    return director_dao.get_all_directors(db, page_request)
+
+
+def iter_all_directors(db, chunk_size):
+    return director_dao.iter_directors(db, chunk_size)
+
+
+def get_all_director_rows_service(db: Session, page_request=None, fields=None):
+    return director_dao.get_all_director_rows(db, page_request, fields)
+
+
+def iter_all_director_rows(db: Session, chunk_size, fields=None):
+    return director_dao.iter_director_rows(db, chunk_size, fields)
+
+
+def get_director_version(db: Session, director_id: int):
+    return director_dao.get_director_version(db, director_id)
+
 
-def get_all_directors_service(db, skip=0, limit=100):
-    return director_dao.get_all_directors(db, skip, limit)
+def get_directors_page_version(db: Session, page_request=None):
+    return director_dao.get_directors_page_version(db, page_request)
 
 
-def update_existing_director(db: Session, director_id: int, director_update):
+def update_existing_director(db: Session, director_id: int, director_update, expected_version=None):
     director = get_director_by_id(db, director_id)
+    check_row_version(director.version, expected_version)
     return director_dao.update_director(db, director, director_update)
 
 
 def delete_existing_director(db: Session, director_id: int):
     director = get_director_by_id(db, director_id)
+    stats_service.director_deleting(db, director_id)
     director_dao.delete_director(db, director)
 
 
@@ -1,6 +1,12 @@
 
-from my_project.dao import movie_dao
+from my_project.dao import movie_dao, search_dao
+from my_project.service import stats_service
 from my_project.dao.movie_dao import movie_dao_get_movies_with_facts
+from my_project.bulk_import import import_records
+from my_project.conditional import check_row_version
+from my_project.lookups import in_request_order
+from my_project.similarity import similar_movies
+from my_project.domain.schemas import MovieCreate
 
 class MovieNotFoundException(Exception):
     pass
@@ -11,22 +17,39 @@ class MovieExistsException(Exception):
 
 
 def create_new_movie(db, movie_schema):
-    existing_movie = movie_dao.get_movie_by_title_and_year( 
-        db,
-        movie_schema.title,
-        movie_schema.release_year
+    new_movie = movie_dao.create_movie(
+        db, movie_schema, before_commit=lambda row: stats_service.movies_created(db, [movie_schema])
     )
-    
-    if existing_movie:
-        raise MovieExistsException("Movie with this title and release year already exists")
-    new_movie = movie_dao.create_movie(db, movie_schema)
     if new_movie is None:
-        raise Exception("Failed to create movie in database.") 
-        
+        raise MovieExistsException("Movie with this title and release year or IMDb code already exists")
     return new_movie
 
-def get_movie_by_id(db, movie_id):
-    db_movie = movie_dao.get_movie_by_id(db, movie_id)
+def _movie_keys(movie):
+    return (("title", movie.title, movie.release_year), ("imdb", movie.imdb_code))
+
+
+def _insert_movies(db, movies):
+    return movie_dao.bulk_insert_movies(db, movies, before_commit=lambda ids: stats_service.movies_created(db, movies))
+
+
+def bulk_create_movies(db, records):
+    return import_records(
+        db, records, MovieCreate, _movie_keys,
+        movie_dao.find_existing_movie_keys, _insert_movies
+    )
+
+def get_movies_batch(db, movie_ids):
+    """([movie or None] in request order, missing ids) with one IN query."""
+    found = movie_dao.get_movies_by_ids(db, movie_ids) if movie_ids else {}
+    return in_request_order(movie_ids, found)
+
+
+def get_movie_includes(db, movie_ids, include):
+    return movie_dao.load_movie_includes(db, movie_ids, include)
+
+
+def get_movie_by_id(db, movie_id, profile=None):
+    db_movie = movie_dao.get_movie_by_id(db, movie_id, profile)
 
     if db_movie is None:
         raise MovieNotFoundException("Movie not found")
@@ -34,18 +57,62 @@ def get_movie_by_id(db, movie_id):
     return db_movie
 
 
-def get_all_movies_service(db, skip, limit):
-    return movie_dao.get_all_movies(db, skip, limit)
+def get_all_movies_service(db, page_request=None, profile=None):
+    return movie_dao.get_all_movies(db, page_request, profile)
+
+
+def iter_all_movies(db, chunk_size, profile=None):
+    return movie_dao.iter_movies(db, chunk_size, profile)
+
+
+def search_movies_service(db, q, limit):
+    return search_dao.search_movies(db, q, limit)
+
+
+def rebuild_search_index(db):
+    search_dao.rebuild_search_index(db)
+
+
+def get_similar_movies_service(db, movie_id, k):
+    """[(movie, score)] for the k movies sharing the most cast and crew with ``movie_id``."""
+    # Checked before the index, so an unknown id is a 404 even while the index is building.
+    if movie_dao.get_movie_by_id(db, movie_id) is None:
+        raise MovieNotFoundException("Movie not found")
+    ranked = similar_movies.similar(movie_id, k)
+    if not ranked:
+        return []
+    movies = movie_dao.get_movies_by_ids(db, [similar_id for similar_id, _ in ranked])
+    return [(movies[similar_id], score) for similar_id, score in ranked if similar_id in movies]
+
+
+def get_all_movie_rows_service(db, page_request=None, fields=None):
+    return movie_dao.get_all_movie_rows(db, page_request, fields)
+
+
+def iter_all_movie_rows(db, chunk_size, fields=None):
+    return movie_dao.iter_movie_rows(db, chunk_size, fields)
+
+
+def get_movie_version(db, movie_id):
+    return movie_dao.get_movie_version(db, movie_id)
+
+
+def get_movies_page_version(db, page_request=None):
+    return movie_dao.get_movies_page_version(db, page_request)
 
 
-def update_existing_movie(db, movie_id, movie_update):
+def update_existing_movie(db, movie_id, movie_update, expected_version=None):
     db_movie = get_movie_by_id(db, movie_id)
+    check_row_version(db_movie.version, expected_version)
+    # Runs in the update's transaction, so a rejected update leaves the stats untouched.
+    stats_service.movie_updating(db, db_movie, movie_update.model_dump(exclude_unset=True))
 
     return movie_dao.update_movie(db, db_movie, movie_update)
 
 
 def delete_existing_movie(db, movie_id):
     db_movie = get_movie_by_id(db, movie_id)
+    stats_service.movie_deleting(db, db_movie)
 
     movie_dao.delete_movie(db, db_movie)
 
@@ -62,5 +129,5 @@ def get_movie_director_service(db, movie_id):
     db_director = movie_dao.find_director_by_movie_id(db, movie_id)
     return db_director
 
-def get_movies_with_facts(db, skip=0, limit=100): 
-    return movie_dao_get_movies_with_facts(db, skip, limit)
\ No newline at end of file
+def get_movies_with_facts(db, page_request=None):
+    return movie_dao_get_movies_with_facts(db, page_request)
\ No newline at end of file
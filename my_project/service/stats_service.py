@@ -0,0 +1,98 @@
+"""Catalog statistics read from the summary tables.
+
+The write paths of the movie, actor and director services call the hooks below so every
+summary row stays current; each read is a single primary-key lookup or keyset page.
+"""
+from decimal import Decimal
+
+from my_project.dao import stats_dao
+
+
+class StatsNotFoundException(Exception):
+    pass
+
+
+def _rating_deltas(rating, sign):
+    rated = rating is not None
+    return {
+        "movie_count": sign,
+        "rated_count": sign if rated else 0,
+        "rating_sum": sign * Decimal(str(rating)) if rated else Decimal(0),
+    }
+
+
+def _add_movie(db, release_year, rating, director_ids, actor_ids, sign):
+    deltas = _rating_deltas(rating, sign)
+    stats_dao.add_to_release_year(db, release_year, deltas)
+    stats_dao.add_to_directors(db, director_ids, deltas)
+    stats_dao.add_to_actors(db, actor_ids, {"movie_count": sign})
+
+
+# -- write hooks --------------------------------------------------------------------------
+
+# The hooks never commit: each runs inside the write it accounts for, so the summary rows
+# change in the same transaction as the catalog rows.
+
+def movies_created(db, movies):
+    """Count freshly inserted movies; they have no cast or crew links yet."""
+    for movie in movies:
+        _add_movie(db, movie.release_year, movie.rating, (), (), 1)
+
+
+def actors_created(db, actor_ids):
+    """Give new actors an empty filmography row, so their stats read as zero rather than missing."""
+    stats_dao.add_to_actors(db, [i for i in actor_ids if i is not None], {"movie_count": 0})
+
+
+def directors_created(db, director_ids):
+    stats_dao.add_to_directors(
+        db, [i for i in director_ids if i is not None],
+        {"movie_count": 0, "rated_count": 0, "rating_sum": Decimal(0)}
+    )
+
+
+def movie_updating(db, db_movie, update_data):
+    """Move the movie's contribution to its new year and rating, before the update commits."""
+    release_year = update_data.get("release_year", db_movie.release_year)
+    rating = update_data.get("rating", db_movie.rating)
+    if release_year == db_movie.release_year and rating == db_movie.rating:
+        return
+    director_ids, _ = stats_dao.movie_links(db, db_movie.movie_id)
+    _add_movie(db, db_movie.release_year, db_movie.rating, director_ids, (), -1)
+    _add_movie(db, release_year, rating, director_ids, (), 1)
+
+
+def movie_deleting(db, db_movie):
+    director_ids, actor_ids = stats_dao.movie_links(db, db_movie.movie_id)
+    _add_movie(db, db_movie.release_year, db_movie.rating, director_ids, actor_ids, -1)
+
+
+def actor_deleting(db, actor_id):
+    stats_dao.delete_stats(db, "actor", actor_id)
+
+
+def director_deleting(db, director_id):
+    stats_dao.delete_stats(db, "director", director_id)
+
+
+def rebuild_stats(db):
+    stats_dao.rebuild_all(db)
+
+
+# -- reads --------------------------------------------------------------------------------
+
+def average_rating(stats):
+    if not stats.rated_count:
+        return None
+    return round(float(stats.rating_sum / stats.rated_count), 2)
+
+
+def get_stats(db, kind, key):
+    stats = stats_dao.get_stats(db, kind, key)
+    if stats is None:
+        raise StatsNotFoundException("No statistics for this key")
+    return stats
+
+
+def get_all_stats_service(db, kind, page_request=None):
+    return stats_dao.get_all_stats(db, kind, page_request)
@@ -0,0 +1,222 @@
+"""Precomputed "similar movies" neighbour lists.
+
+Every movie is a sparse row over actor and director features. An actor weighs
+1 / billing_order, or ``unbilled_weight`` when the order is unknown. A director weighs
+``director_weight``. Rows are L2-normalised, so a pair's score is the cosine of their
+cast-and-crew vectors.
+
+The score matrix X @ X.T is never materialised. It is computed ``block_size`` rows at a
+time and only the top ``top_k`` neighbours of each row are kept. That bounds memory at
+roughly one block of scores plus X itself, which is what makes a full build for a
+million movies fit on one box. Features shared by more than ``max_feature_movies`` movies
+are dropped first. They say little about similarity and would make every block dense.
+"""
+import logging
+import threading
+import time
+from typing import NamedTuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from my_project.config import get_section
+from my_project.dao import graph_dao
+from my_project.database import ReadSessionLocal
+from my_project.domain.models import Movie, MovieActor, MovieDirector
+
+settings = get_section('similarity', {
+    'top_k': 50,
+    'director_weight': 2.0,
+    'unbilled_weight': 0.1,
+    'max_feature_movies': 5000,
+    'block_size': 2000,
+    'rebuild_delay_seconds': 60,
+    'rebuild_seconds': 3600,
+})
+
+logger = logging.getLogger("my_project.similarity")
+
+
+class SimilarityNotReadyException(Exception):
+    pass
+
+
+class NeighbourTable(NamedTuple):
+    movie_ids: np.ndarray   # sorted, one per row
+    neighbours: np.ndarray  # (movies, top_k) row indexes into movie_ids, -1 padded
+    scores: np.ndarray      # (movies, top_k) float32, descending per row
+    built_at: float
+
+
+def _concat(batches, columns):
+    arrays = [np.asarray(batch, dtype=np.int64) for batch in batches]
+    if not arrays:
+        return np.empty((0, columns), dtype=np.int64)
+    return np.concatenate(arrays)
+
+
+def build_feature_matrix(cast, crew):
+    """(movie_ids, X) from (movie_id, actor_id, billing_order) and (movie_id, director_id) arrays."""
+    movie_ids = np.unique(np.concatenate([cast[:, 0], crew[:, 0]]))
+    actor_ids, actor_cols = np.unique(cast[:, 1], return_inverse=True)
+    director_ids, director_cols = np.unique(crew[:, 1], return_inverse=True)
+
+    billing = cast[:, 2].astype(np.float32)
+    actor_weights = np.where(billing > 0, 1.0 / np.maximum(billing, 1), settings['unbilled_weight'])
+    director_weights = np.full(len(crew), settings['director_weight'], dtype=np.float32)
+
+    rows = np.concatenate([np.searchsorted(movie_ids, cast[:, 0]), np.searchsorted(movie_ids, crew[:, 0])])
+    cols = np.concatenate([actor_cols, director_cols + len(actor_ids)])
+    data = np.concatenate([actor_weights, director_weights]).astype(np.float32)
+    shape = (len(movie_ids), len(actor_ids) + len(director_ids))
+    matrix = sparse.csr_matrix((data, (rows, cols)), shape=shape, dtype=np.float32)
+
+    document_frequency = np.bincount(matrix.indices, minlength=shape[1])
+    keep = document_frequency <= settings['max_feature_movies']
+    matrix = matrix @ sparse.diags(keep.astype(np.float32))
+    matrix.eliminate_zeros()
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    matrix = sparse.diags(np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)) @ matrix
+    return movie_ids, matrix.tocsr()
+
+
+def top_k_neighbours(matrix, top_k, block_size):
+    movies = matrix.shape[0]
+    neighbours = np.full((movies, top_k), -1, dtype=np.int32)
+    scores = np.zeros((movies, top_k), dtype=np.float32)
+    transposed = matrix.T.tocsr()
+
+    for start in range(0, movies, block_size):
+        block = (matrix[start:start + block_size] @ transposed).tocsr()
+        # A movie is not its own neighbour.
+        owners = np.repeat(np.arange(start, start + block.shape[0]), np.diff(block.indptr))
+        block.data[block.indices == owners] = 0
+        block.eliminate_zeros()
+
+        for row in range(block.shape[0]):
+            begin, end = block.indptr[row], block.indptr[row + 1]
+            if begin == end:
+                continue
+            candidates, values = block.indices[begin:end], block.data[begin:end]
+            if len(values) > top_k:
+                best = np.argpartition(-values, top_k - 1)[:top_k]
+                candidates, values = candidates[best], values[best]
+            order = np.lexsort((candidates, -values))
+            neighbours[start + row, :len(order)] = candidates[order]
+            scores[start + row, :len(order)] = values[order]
+    return neighbours, scores
+
+
+class SimilarMovies:
+    def __init__(self, session_factory=ReadSessionLocal):
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._table = None
+        self._dirty = False
+        self._rebuilding = False
+
+    def build(self):
+        started = time.perf_counter()
+        db = self.session_factory()
+        try:
+            cast = _concat(graph_dao.iter_cast_link_batches(db), 3)
+            crew = _concat(graph_dao.iter_crew_link_batches(db), 2)
+        finally:
+            db.close()
+
+        top_k = settings['top_k']
+        if not len(cast) and not len(crew):
+            empty = np.empty((0, top_k))
+            self._table = NeighbourTable(np.empty(0, np.int64), empty.astype(np.int32), empty.astype(np.float32), time.monotonic())
+            return
+
+        movie_ids, matrix = build_feature_matrix(cast, crew)
+        neighbours, scores = top_k_neighbours(matrix, top_k, settings['block_size'])
+        self._table = NeighbourTable(movie_ids, neighbours, scores, time.monotonic())
+        logger.info(
+            "similar movies rebuilt: %d movies, %d links in %.1fs",
+            len(movie_ids), matrix.nnz, time.perf_counter() - started
+        )
+
+    def _rebuild_loop(self):
+        try:
+            while True:
+                table = self._table
+                if table is not None:
+                    # Debounce bursts of link changes into one rebuild.
+                    time.sleep(max(0.0, table.built_at + settings['rebuild_delay_seconds'] - time.monotonic()))
+                with self._lock:
+                    self._dirty = False
+                self.build()
+                with self._lock:
+                    if not self._dirty:
+                        self._rebuilding = False
+                        return
+        except Exception:
+            logger.exception("similar movies rebuild failed")
+            with self._lock:
+                self._rebuilding = False
+
+    def mark_dirty(self):
+        with self._lock:
+            self._dirty = True
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_loop, name="similar-movies-rebuild", daemon=True).start()
+
+    def similar(self, movie_id: int, k: int):
+        """[(movie_id, score)] best first; empty for movies without cast or crew links."""
+        table = self._table
+        if table is None:
+            self.mark_dirty()
+            raise SimilarityNotReadyException("Similar movies are still being computed")
+        if time.monotonic() - table.built_at > settings['rebuild_seconds']:
+            self.mark_dirty()
+
+        row = np.searchsorted(table.movie_ids, movie_id)
+        if row >= len(table.movie_ids) or table.movie_ids[row] != movie_id:
+            return []
+        neighbours, scores = table.neighbours[row, :k], table.scores[row, :k]
+        found = neighbours >= 0
+        return list(zip(table.movie_ids[neighbours[found]].tolist(), scores[found].tolist()))
+
+    def stats(self):
+        table = self._table
+        if table is None:
+            return {"built": False, "rebuilding": self._rebuilding}
+        return {
+            "built": True,
+            "rebuilding": self._rebuilding,
+            "movies": len(table.movie_ids),
+            "age_seconds": round(time.monotonic() - table.built_at, 1),
+        }
+
+
+similar_movies = SimilarMovies()
+
+
+def _flag(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info["similar_movies_dirty"] = True
+
+
+for _model in (MovieActor, MovieDirector):
+    event.listen(_model, "after_insert", _flag)
+    event.listen(_model, "after_delete", _flag)
+event.listen(Movie, "after_delete", _flag)
+
+
+@event.listens_for(Session, "after_commit")
+def _rebuild_after_commit(session):
+    if session.info.pop("similar_movies_dirty", False):
+        similar_movies.mark_dirty()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop("similar_movies_dirty", None)
@@ -0,0 +1,72 @@
+from flask import Response, stream_with_context
+
+from my_project.config import get_section
+from my_project.database import ReadSessionLocal
+from my_project.serialization import compact_encoder
+
+settings = get_section('streaming', {
+    'chunk_size': 500,
+})
+
+STREAM_FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class StreamingException(Exception):
+    pass
+
+
+def read_stream_format(args):
+    stream_format = args.get('stream')
+    if stream_format is None:
+        return None
+    if stream_format not in STREAM_FORMATS:
+        raise StreamingException("stream must be 'json' or 'ndjson'")
+    return stream_format
+
+
+def _encode(rows, serialize, stream_format):
+    # Compact like jsonify in production, so a streamed row has the same bytes as a buffered one.
+    dumps = compact_encoder().encode
+    if stream_format == 'ndjson':
+        for row in rows:
+            yield dumps(serialize(row)) + '\n'
+        return
+
+    separator = '['
+    for row in rows:
+        yield separator + dumps(serialize(row))
+        separator = ','
+    yield '[]' if separator == '[' else ']'
+
+
+def _buffered(parts, chunk_size):
+    buffer = []
+    for part in parts:
+        buffer.append(part)
+        if len(buffer) >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def streaming_response(load_rows, serialize, stream_format):
+    """Stream rows as a JSON array or NDJSON while they are read from the database.
+
+    The generator outlives the view function, so it owns its session instead of using
+    the request's one.
+    """
+    chunk_size = settings['chunk_size']
+
+    def generate():
+        db = ReadSessionLocal()
+        try:
+            rows = load_rows(db, chunk_size)
+            yield from _buffered(_encode(rows, serialize, stream_format), chunk_size)
+        finally:
+            db.close()
+
+    return Response(stream_with_context(generate()), mimetype=STREAM_FORMATS[stream_format])
@@ -0,0 +1,141 @@
+"""Per-table change counters shared by every worker.
+
+Each table's version is bumped in the table_versions table when a session that wrote to
+it commits. The entity and response caches tag what they store with the versions of the
+tables it was built from, so an entry is served only while none of them have changed,
+whichever worker wrote them. Workers re-read the versions at most every ``poll_seconds``;
+lookups in between are answered without touching the database.
+"""
+import logging
+import threading
+import time
+
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from my_project.config import get_section
+from my_project.dao import table_version_dao
+from my_project.database import get_engine
+
+settings = get_section('table_versions', {
+    'poll_seconds': 1.0,
+})
+
+logger = logging.getLogger("my_project.table_versions")
+
+
+class TableVersions:
+    """Versions kept in the database and read through a short local copy.
+
+    A commit in this worker forces the next lookup to re-read, so its own writes are seen
+    at once; writes from other workers are seen within ``poll_seconds``.
+    """
+
+    def __init__(self):
+        self._versions = None
+        self._read_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        # One thread re-reads; the others keep using the copy they have.
+        if not self._lock.acquire(blocking=self._versions is None):
+            return
+        try:
+            with get_engine().connect() as conn:
+                self._versions = table_version_dao.read_versions(conn)
+            self._read_at = time.monotonic()
+        except DBAPIError:
+            logger.exception("could not read table versions")
+            self._versions = None
+        finally:
+            self._lock.release()
+
+    def current(self, tables):
+        """The versions of ``tables``, or None when they cannot be read (caches are bypassed)."""
+        if self._versions is None or time.monotonic() - self._read_at > settings['poll_seconds']:
+            self._refresh()
+        versions = self._versions
+        if versions is None:
+            return None
+        return tuple(versions.get(table, 0) for table in tables)
+
+    def bump(self, tables):
+        try:
+            with get_engine().begin() as conn:
+                table_version_dao.bump_versions(conn, tables)
+        except DBAPIError:
+            # The write itself has committed; other workers may serve stale entries until their ttl.
+            logger.exception("could not bump table versions for %s", sorted(tables))
+        self._read_at = 0.0
+
+
+table_versions = TableVersions()
+
+
+# Tables written by a session are collected as it flushes and executes DML, and bumped
+# only once it commits.
+
+def _record_tables(session, tables):
+    session.info.setdefault("written_tables", set()).update(tables)
+
+
+def _changed_tables(instance, change):
+    """Tables whose rows the flush wrote for ``instance``; ``change`` is new, dirty or deleted."""
+    state = inspect(instance)
+    mapper = state.mapper
+    tables = set()
+    if change != "dirty" or any(state.attrs[column.key].history.has_changes() for column in mapper.column_attrs):
+        tables.update(table.name for table in mapper.tables)
+    for rel in mapper.relationships:
+        # Link rows of many-to-many relationships are written without objects of their own,
+        # and only when the collection changed or its owner is deleted.
+        if rel.secondary is not None and (change == "deleted" or state.attrs[rel.key].history.has_changes()):
+            tables.add(rel.secondary.name)
+    return tables
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed(session, flush_context):
+    tables = set()
+    for change, instances in (("new", session.new), ("dirty", session.dirty), ("deleted", session.deleted)):
+        for instance in instances:
+            tables |= _changed_tables(instance, change)
+    _record_tables(session, tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_executed(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return None
+    table = getattr(orm_execute_state.statement, "table", None)
+    if table is None:
+        return None
+
+    # Only a statement that changed rows makes cached entries stale; an ON CONFLICT DO
+    # NOTHING that hit an existing row must not flush every entry built on the table.
+    result = orm_execute_state.invoke_statement()
+    if getattr(result, "returns_rows", False):
+        # With RETURNING the rows themselves are the count: buffer them and hand back a copy.
+        frozen = result.freeze()
+        changed = bool(frozen().all())
+        result = frozen()
+    else:
+        # ORM bulk inserts carry no rowcount and drivers that cannot tell report -1;
+        # both count as a change.
+        changed = getattr(result, "rowcount", -1) != 0
+    if changed:
+        _record_tables(orm_execute_state.session, {table.name})
+    return result
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed(session):
+    tables = session.info.pop("written_tables", None)
+    if tables:
+        table_versions.bump(tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop("written_tables", None)
@@ -0,0 +1,28 @@
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import event
+
+# Must be set before my_project.database is imported: the engine URL is read at import time.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+
+
+@pytest.fixture
+def client():
+    from app import create_app
+    return create_app().test_client()
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    from my_project.database import get_engine
+    engine = get_engine()
+    event.listen(engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(engine, "before_cursor_execute", count)
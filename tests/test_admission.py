@@ -0,0 +1,31 @@
+from app import create_app
+from my_project import admission
+
+
+def test_full_budget_sheds_with_retry_after(client):
+    exports = admission.budgets["exports"]
+    held = [exports.acquire() for _ in range(exports.concurrency)]
+    assert held == [None] * exports.concurrency
+    try:
+        response = client.get("/export/directors")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(admission.settings["retry_after_seconds"])
+    finally:
+        for _ in held:
+            exports.release()
+    assert exports.active == 0
+
+
+def test_slot_is_released_when_the_view_raises():
+    app = create_app()
+    default = admission.budgets["default"]
+    active_in_view = []
+
+    @app.get("/boom")
+    def boom():
+        active_in_view.append(default.active)
+        raise RuntimeError("boom")
+
+    assert app.test_client().get("/boom").status_code == 500
+    assert active_in_view == [1]
+    assert default.active == 0
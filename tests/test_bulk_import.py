@@ -0,0 +1,64 @@
+import json
+
+from sqlalchemy import func, select
+
+from benchmarks.catalog import generate
+from my_project import bulk_import
+from my_project.database import get_engine
+from my_project.domain.models import Director
+
+
+def _director(imdb_code, **fields):
+    return {"first_name": "Ada", "last_name": "Lane", "imdb_code": imdb_code, **fields}
+
+
+def _director_count():
+    with get_engine().connect() as conn:
+        return conn.execute(select(func.count()).select_from(Director)).scalar()
+
+
+def test_mixed_batch_reports_every_row(client, monkeypatch):
+    generate(get_engine(), movies=5, mean_cast=1)
+    with get_engine().connect() as conn:
+        stored = conn.execute(select(Director.imdb_code).limit(1)).scalar()
+    before = _director_count()
+    monkeypatch.setitem(bulk_import.settings, "chunk_size", 3)
+
+    records = [
+        # First chunk: the invalid row sends it through per-row validation.
+        _director("nm9000001"),
+        {"first_name": "No Last Name", "imdb_code": "nm9000002"},
+        _director(stored),
+        # Second chunk: a repeat of a row created by the first chunk, and one of a row earlier in the chunk.
+        _director("nm9000003"),
+        _director("nm9000001"),
+        _director("nm9000003", first_name="Other"),
+    ]
+    response = client.post("/directors/bulk", json=records)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    body = response.get_json()
+
+    assert [(item["row"], item["status"]) for item in body["results"]] == [
+        (0, "created"), (1, "invalid"), (2, "duplicate"), (3, "created"), (4, "duplicate"), (5, "duplicate"),
+    ]
+    assert body["results"][1]["errors"][0]["loc"] == ["last_name"]
+    assert (body["created"], body["duplicate"], body["invalid"]) == (2, 3, 1)
+    assert _director_count() == before + 2
+    created_ids = [item["id"] for item in body["results"] if item["status"] == "created"]
+    assert [client.get(f"/directors/{director_id}").get_json()["imdb_code"] for director_id in created_ids] == [
+        "nm9000001", "nm9000003",
+    ]
+
+
+def test_ndjson_rows_are_numbered_skipping_blank_lines(client):
+    generate(get_engine(), movies=5, mean_cast=1)
+    lines = [json.dumps(_director("nm9100001")), "", "{not json", json.dumps(_director("nm9100002"))]
+    response = client.post("/directors/bulk", data="\n".join(lines) + "\n", content_type="application/x-ndjson")
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert [(item["row"], item["status"]) for item in response.get_json()["results"]] == [
+        (0, "created"), (1, "invalid"), (2, "created"),
+    ]
+
+
+def test_body_that_is_not_an_array_is_rejected(client):
+    assert client.post("/directors/bulk", json={"imdb_code": "nm1"}).status_code == 400
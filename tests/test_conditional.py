@@ -0,0 +1,41 @@
+from benchmarks.catalog import generate
+from my_project.database import get_engine
+
+
+def test_unknown_director_is_not_found(client):
+    generate(get_engine(), movies=3, mean_cast=1)
+    assert client.get("/directors/9999").status_code == 404
+    assert client.get("/directors/9999", headers={"If-None-Match": '"x"'}).status_code == 404
+
+
+def test_unknown_director_writes_are_not_found(client):
+    generate(get_engine(), movies=3, mean_cast=1)
+    assert client.put("/directors/9999", json={"first_name": "X"}).status_code == 404
+    assert client.patch("/directors/9999", json={"first_name": "X"}).status_code == 404
+    assert client.delete("/directors/9999").status_code == 404
+    assert client.get("/directors/9999/movies").status_code == 404
+
+
+def test_matching_if_none_match_is_not_modified(client):
+    generate(get_engine(), movies=3, mean_cast=1)
+    for path in ("/movies/1", "/actors/1", "/directors/1", "/movies/?limit=2"):
+        etag = client.get(path).headers["ETag"]
+        response = client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == 304, path
+        assert response.headers["ETag"] == etag
+
+
+def test_stale_if_match_is_rejected_and_fresh_one_accepted(client):
+    generate(get_engine(), movies=3, mean_cast=1)
+    stale = client.get("/directors/1").headers["ETag"]
+
+    updated = client.patch("/directors/1", json={"first_name": "Renamed"}, headers={"If-Match": stale})
+    assert updated.status_code == 200
+    fresh = updated.headers["ETag"]
+    assert fresh != stale
+    assert client.get("/directors/1").headers["ETag"] == fresh
+    assert client.get("/directors/1", headers={"If-None-Match": stale}).status_code == 200
+
+    rejected = client.put("/directors/1", json={"first_name": "Again"}, headers={"If-Match": stale})
+    assert rejected.status_code == 412
+    assert client.get("/directors/1").get_json()["first_name"] == "Renamed"
@@ -0,0 +1,28 @@
+from sqlalchemy import update
+
+from benchmarks.catalog import generate
+from my_project.cache import entity_cache
+from my_project.dao.table_version_dao import bump_versions
+from my_project.database import get_engine
+from my_project.domain.models import Director
+from my_project.table_versions import settings, table_versions
+
+
+def test_write_in_another_worker_retires_entity_entries(client, statements, monkeypatch):
+    generate(get_engine(), movies=5, mean_cast=2)
+    entity_cache.local.clear()
+    # generate() recreates table_versions, so drop the copy read before it.
+    monkeypatch.setitem(settings, "poll_seconds", 0)
+    table_versions.current(())
+    monkeypatch.setitem(settings, "poll_seconds", 3600)
+    client.get("/directors/1")
+
+    statements.clear()
+    assert client.get("/directors/1").status_code == 200
+    assert statements == []
+
+    with get_engine().begin() as conn:
+        conn.execute(update(Director).where(Director.director_id == 1).values(first_name="Changed Elsewhere"))
+        bump_versions(conn, {"directors"})
+    monkeypatch.setitem(settings, "poll_seconds", 0)
+    assert client.get("/directors/1").get_json()["first_name"] == "Changed Elsewhere"
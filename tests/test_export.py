@@ -0,0 +1,31 @@
+import csv
+import io
+import json
+
+import pyarrow.parquet as pq
+
+from benchmarks.catalog import generate
+from my_project import export
+from my_project.database import get_engine
+from my_project.domain.models import Director, MovieDirector
+
+
+def test_movies_export_every_row_in_key_order(monkeypatch):
+    generate(get_engine(), movies=20, mean_cast=3)
+    monkeypatch.setitem(export.settings, "batch_size", 7)
+    lines = b"".join(export.iter_export("movies", "ndjson")).splitlines()
+    movie_ids = [json.loads(line)["movie_id"] for line in lines]
+    assert movie_ids == sorted(movie_ids) and len(movie_ids) == 20
+
+    table = pq.read_table(io.BytesIO(b"".join(export.iter_export("movies", "parquet"))))
+    assert table.num_rows == 20
+    assert table.column_names == export.export_keys("movies")
+
+
+def test_csv_export_of_empty_table_has_header():
+    generate(get_engine(), movies=5, mean_cast=2)
+    with get_engine().begin() as conn:
+        conn.execute(MovieDirector.__table__.delete())
+        conn.execute(Director.__table__.delete())
+    body = b"".join(export.iter_export("directors", "csv")).decode()
+    assert list(csv.reader(io.StringIO(body))) == [export.export_keys("directors")]
@@ -0,0 +1,34 @@
+import pytest
+from flask import g
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from benchmarks.catalog import generate
+from my_project.database import QueryStats, get_engine
+
+
+def test_failed_statement_leaves_no_start_time_behind():
+    with get_engine().connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM no_such_table"))
+        assert "query_started" not in conn.info
+
+
+def test_selects_count_rows_fetched_and_dml_rows_affected(client):
+    with client.application.app_context():
+        g.query_stats = stats = QueryStats()
+        with get_engine().begin() as conn:
+            conn.execute(text("CREATE TEMP TABLE t (x INTEGER)"))
+            conn.execute(text("INSERT INTO t VALUES (1), (2), (3)"))
+            conn.execute(text("SELECT x FROM t")).all()
+    assert stats.count == 3
+    assert stats.rows_affected == 3
+    assert stats.rows_fetched == 3
+
+
+def test_server_timing_reports_rows_fetched(client):
+    generate(get_engine(), movies=10, mean_cast=2)
+    response = client.get("/movies/?limit=4")
+    assert response.status_code == 200
+    # limit + 1 rows are read to tell whether there is a next page.
+    assert 'queries, 5 rows"' in response.headers["Server-Timing"]
@@ -0,0 +1,32 @@
+from sqlalchemy import select
+
+from benchmarks.catalog import generate
+from my_project.dao import graph_dao
+from my_project.database import SessionLocal, get_engine
+from my_project.domain.models import MovieActor
+
+
+def test_cast_links_are_paged_in_key_order(monkeypatch):
+    generate(get_engine(), movies=30, mean_cast=4)
+    monkeypatch.setattr(graph_dao, "LINK_BATCH_SIZE", 7)
+    db = SessionLocal()
+    try:
+        expected = db.execute(
+            select(MovieActor.actor_id, MovieActor.movie_id).order_by(MovieActor.actor_id, MovieActor.movie_id)
+        ).all()
+        assert [tuple(row) for row in graph_dao.iter_cast_links(db, by="actor")] == [tuple(row) for row in expected]
+    finally:
+        db.close()
+
+
+def test_similarity_batches_cover_every_link(monkeypatch):
+    generate(get_engine(), movies=30, mean_cast=4)
+    monkeypatch.setattr(graph_dao, "LINK_BATCH_SIZE", 7)
+    db = SessionLocal()
+    try:
+        batches = list(graph_dao.iter_cast_link_batches(db))
+        assert all(len(batch) <= 7 for batch in batches)
+        links = {(movie_id, actor_id) for batch in batches for movie_id, actor_id, _ in batch}
+        assert links == {tuple(row) for row in db.execute(select(MovieActor.movie_id, MovieActor.actor_id))}
+    finally:
+        db.close()
@@ -0,0 +1,82 @@
+import base64
+import json
+
+import pytest
+from sqlalchemy import select, update
+
+from benchmarks.catalog import generate
+from my_project import pagination
+from my_project.database import get_engine
+from my_project.domain.models import Movie
+
+
+@pytest.fixture
+def movies():
+    generate(get_engine(), movies=30, mean_cast=1)
+    with get_engine().begin() as conn:
+        # Ties and NULLs, so the primary-key tiebreak and the NULL branches are exercised.
+        conn.execute(update(Movie).where(Movie.movie_id % 3 == 0).values(release_year=2000))
+        conn.execute(update(Movie).where(Movie.movie_id % 4 == 0).values(rating=None))
+        conn.execute(update(Movie).where(Movie.movie_id % 5 == 0).values(rating=5))
+        return conn.execute(select(Movie.movie_id, Movie.imdb_code, Movie.release_year, Movie.rating)).all()
+
+
+def _expected(movies, sort, descending):
+    def key(movie):
+        value = getattr(movie, sort)
+        # NULLs first ascending and last descending, ties broken by primary key.
+        return (value is not None, value or 0, movie.movie_id)
+    return [movie.imdb_code for movie in sorted(movies, key=key, reverse=descending)]
+
+
+def _walk(client, query):
+    codes, cursor = [], None
+    while True:
+        response = client.get("/movies/", query_string={**query, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.get_data(as_text=True)
+        codes += [movie["imdb_code"] for movie in response.get_json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return codes
+
+
+@pytest.mark.parametrize("sort", ["movie_id", "release_year", "rating"])
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_walking_every_page_returns_each_row_once_in_order(client, movies, sort, order):
+    codes = _walk(client, {"sort": sort, "order": order, "limit": 4})
+    assert codes == _expected(movies, sort, order == "desc")
+
+
+def _decode(cursor):
+    return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+
+
+def _encode(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def test_tampered_cursor_is_rejected(client, movies):
+    cursor = client.get("/movies/", query_string={"sort": "rating", "limit": 4}).headers["X-Next-Cursor"]
+    payload = _decode(cursor)
+
+    for bad in (
+        "not-a-cursor",
+        cursor[:-3],
+        _encode({**payload, "k": "one"}),
+        _encode({**payload, "v": "high"}),
+        _encode({key: value for key, value in payload.items() if key != "v"}),
+    ):
+        response = client.get("/movies/", query_string={"sort": "rating", "limit": 4, "cursor": bad})
+        assert response.status_code == 400, bad
+
+    # A cursor is only valid for the sort and order it was issued for.
+    for query in ({"sort": "release_year"}, {"sort": "rating", "order": "desc"}):
+        assert client.get("/movies/", query_string={**query, "cursor": cursor}).status_code == 400
+
+
+def test_limit_is_capped_at_max_page_size(client, movies, monkeypatch):
+    monkeypatch.setitem(pagination.settings, "max_page_size", 7)
+    response = client.get("/movies/", query_string={"limit": 1000})
+    assert len(response.get_json()) == 7
+    assert "X-Next-Cursor" in response.headers
+    assert len(client.get("/movies/", query_string={"limit": 0}).get_json()) == 1
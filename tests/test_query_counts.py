@@ -0,0 +1,36 @@
+"""Each endpoint must issue a fixed number of SQL statements, however much data it returns."""
+from benchmarks.catalog import generate
+from my_project.cache import entity_cache
+from my_project.database import get_engine
+from my_project.response_cache import response_cache
+from my_project.table_versions import settings as table_version_settings, table_versions
+
+ENDPOINTS = [
+    "/movies/movies-grouped-details",
+    "/movies/1",
+    "/actors/",
+]
+
+
+def _statements_per_endpoint(client, statements, movies):
+    generate(get_engine(), movies=movies, mean_cast=6)
+    # Cached responses would hide the queries being counted.
+    entity_cache.local.clear()
+    response_cache.store.clear()
+    # Read the table versions now rather than at whichever request the poll interval ends.
+    table_versions.current(())
+
+    counts = {}
+    for url in ENDPOINTS:
+        statements.clear()
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.get_data(as_text=True))
+        counts[url] = len(statements)
+    return counts
+
+
+def test_query_count_does_not_grow_with_data(client, statements, monkeypatch):
+    monkeypatch.setitem(table_version_settings, "poll_seconds", 3600)
+    small = _statements_per_endpoint(client, statements, movies=20)
+    large = _statements_per_endpoint(client, statements, movies=40)
+    assert small == large
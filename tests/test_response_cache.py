@@ -0,0 +1,57 @@
+from sqlalchemy import update
+
+from benchmarks.catalog import generate
+from my_project.dao.table_version_dao import bump_versions, read_versions
+from my_project.database import SessionLocal, get_engine
+from my_project.domain.models import Actor, Movie
+from my_project.response_cache import response_cache
+from my_project.table_versions import settings
+
+
+def test_write_in_another_worker_invalidates_entries(client, statements, monkeypatch):
+    generate(get_engine(), movies=5, mean_cast=2)
+    response_cache.store.clear()
+    monkeypatch.setitem(settings, "poll_seconds", 3600)
+    client.get("/movies/?sort=movie_id")
+
+    statements.clear()
+    assert client.get("/movies/?sort=movie_id").status_code == 200
+    assert statements == []
+
+    # What another worker's commit leaves behind: the row change and the version bump.
+    with get_engine().begin() as conn:
+        conn.execute(update(Movie).where(Movie.movie_id == 1).values(title="Changed Elsewhere"))
+        bump_versions(conn, {"movies"})
+    monkeypatch.setitem(settings, "poll_seconds", 0)
+    assert b"Changed Elsewhere" in client.get("/movies/?sort=movie_id").get_data()
+
+
+def test_only_changed_tables_are_recorded():
+    generate(get_engine(), movies=5, mean_cast=2)
+    db = SessionLocal()
+    try:
+        actor = db.get(Actor, 1)
+        actor.movies  # a loaded, unchanged many-to-many collection
+        actor.name = "Renamed"
+        db.flush()
+        assert db.info["written_tables"] == {"actors"}
+    finally:
+        db.rollback()
+        db.close()
+
+
+def _movie_version():
+    with get_engine().connect() as conn:
+        return read_versions(conn).get("movies", 0)
+
+
+def test_only_inserts_that_add_a_row_bump_the_table(client):
+    generate(get_engine(), movies=5, mean_cast=2)
+    movie = {"title": "Bump Test", "release_year": 1999, "duration": 100, "imdb_code": "tt9300001"}
+    before = _movie_version()
+    assert client.post("/movies/", json=movie).status_code == 201
+    created = _movie_version()
+    assert created == before + 1
+
+    assert client.post("/movies/", json=movie).status_code == 409
+    assert _movie_version() == created
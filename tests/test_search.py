@@ -0,0 +1,51 @@
+from sqlalchemy import insert, text
+
+from benchmarks.catalog import generate
+from my_project.database import SessionLocal, get_engine
+from my_project.domain.models import Movie, MovieFact
+from my_project.service.movie_service import rebuild_search_index
+
+
+def _add_movies():
+    generate(get_engine(), movies=3, mean_cast=1)
+    with get_engine().begin() as conn:
+        conn.execute(insert(Movie), [
+            {"movie_id": 101, "title": "Zanzibar Nights", "release_year": 2001, "duration": 90,
+             "description": "", "imdb_code": "tt0000101"},
+            {"movie_id": 102, "title": "Quiet Harbour", "release_year": 2002, "duration": 95,
+             "description": "", "imdb_code": "tt0000102"},
+        ])
+        conn.execute(insert(MovieFact), [{"movie_id": 102, "fact_text": "Shot partly in Zanzibar."}])
+
+
+def _search(client, q):
+    response = client.get("/movies/search", query_string={"q": q})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return [movie["title"] for movie in response.get_json()]
+
+
+def test_title_hits_outrank_fact_hits(client):
+    _add_movies()
+    assert _search(client, "zanzibar") == ["Zanzibar Nights", "Quiet Harbour"]
+
+
+def test_query_syntax_is_taken_literally(client):
+    _add_movies()
+    for q in ('"zanzibar', "zanzibar AND (", "NEAR(zanzibar", "title:harbour", "*"):
+        _search(client, q)
+    assert _search(client, "harbour OR nothing") == ["Quiet Harbour"]
+
+
+def test_rebuild_indexes_existing_rows(client):
+    _add_movies()
+    # A database whose rows predate the search index.
+    with get_engine().begin() as conn:
+        conn.execute(text("DELETE FROM movie_search"))
+    assert _search(client, "zanzibar") == []
+
+    db = SessionLocal()
+    try:
+        rebuild_search_index(db)
+    finally:
+        db.close()
+    assert _search(client, "zanzibar") == ["Zanzibar Nights", "Quiet Harbour"]
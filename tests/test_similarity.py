@@ -0,0 +1,14 @@
+from benchmarks.catalog import generate
+from my_project.database import get_engine
+from my_project.similarity import similar_movies
+
+
+def test_unknown_movie_is_not_found_while_index_builds(client, monkeypatch):
+    generate(get_engine(), movies=5, mean_cast=2)
+    monkeypatch.setattr(similar_movies, "_table", None)
+    monkeypatch.setattr(similar_movies, "mark_dirty", lambda: None)
+
+    assert client.get("/movies/9999/similar").status_code == 404
+    response = client.get("/movies/1/similar")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "30"
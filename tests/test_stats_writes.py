@@ -0,0 +1,25 @@
+from benchmarks.catalog import generate
+from my_project.database import get_engine
+
+MOVIE = {
+    "title": "Stats Test", "release_year": 1999, "duration": 100,
+    "description": "", "imdb_code": "tt9999999", "rating": 7.5,
+}
+
+
+def test_create_updates_stats_in_the_same_transaction(client, statements):
+    generate(get_engine(), movies=5, mean_cast=2)
+    before = client.get("/stats/years/1999").get_json()
+
+    statements.clear()
+    response = client.post("/movies/", json=MOVIE)
+    assert response.status_code == 201, response.get_data(as_text=True)
+    # The INSERT and the release-year upsert; the new movie is not re-read after the commit.
+    in_transaction = [s.split()[0] for s in statements if "table_versions" not in s]
+    assert in_transaction == ["INSERT", "INSERT"]
+
+    after = client.get("/stats/years/1999").get_json()
+    assert after["movie_count"] == (before or {}).get("movie_count", 0) + 1
+
+    assert client.post("/movies/", json=MOVIE).status_code == 409
+    assert client.get("/stats/years/1999").get_json() == after
@@ -0,0 +1,10 @@
+from benchmarks.catalog import generate
+from my_project.database import get_engine
+
+
+def test_streamed_array_matches_buffered_response(client):
+    generate(get_engine(), movies=5, mean_cast=3)
+    buffered = client.get("/actors/?sort=actor_id").get_data()
+    streamed = client.get("/actors/?sort=actor_id&stream=json").get_data()
+    # jsonify ends its body with a newline; the stream closes the array without one.
+    assert streamed + b"\n" == buffered
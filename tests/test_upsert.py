@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from benchmarks.catalog import generate
+from my_project.dao import upsert
+from my_project.database import SessionLocal, get_engine
+from my_project.domain.models import Director, Movie
+from my_project.table_versions import table_versions
+
+DIRECTOR = {"first_name": "Ada", "last_name": "Lane", "imdb_code": "nm9200001"}
+MOVIE = {
+    "title": "Upsert Test", "release_year": 1998, "duration": 100,
+    "description": "", "imdb_code": "tt9200001", "rating": 6.0,
+}
+
+
+def _count(model, **where):
+    with get_engine().connect() as conn:
+        query = select(func.count()).select_from(model).filter_by(**where)
+        return conn.execute(query).scalar()
+
+
+def _insert_twice():
+    db = SessionLocal()
+    inserted = []
+    try:
+        first = upsert.insert_if_absent(db, Director, DIRECTOR, before_commit=inserted.append)
+        # Read now: a later commit in this session expires the instance.
+        first = {"director_id": first.director_id, "version": first.version}
+        second = upsert.insert_if_absent(db, Director, DIRECTOR, before_commit=inserted.append)
+        return first, second, inserted
+    finally:
+        db.close()
+
+
+def test_returning_path_inserts_once():
+    generate(get_engine(), movies=3, mean_cast=1)
+    first, second, inserted = _insert_twice()
+    assert first is not None and second is None
+    assert [row["imdb_code"] for row in inserted] == [DIRECTOR["imdb_code"]]
+    assert inserted[0]["director_id"] == first["director_id"]
+    assert _count(Director, imdb_code=DIRECTOR["imdb_code"]) == 1
+
+
+def _without_on_conflict(monkeypatch):
+    # Take the path MySQL takes. The table-version bump after each commit is itself an
+    # ON CONFLICT upsert, so it is skipped here.
+    monkeypatch.setattr(upsert, "ON_CONFLICT_INSERTS", {})
+    monkeypatch.setattr(table_versions, "bump", lambda tables: None)
+
+
+def test_plain_insert_path_treats_duplicate_key_as_absent(monkeypatch):
+    generate(get_engine(), movies=3, mean_cast=1)
+    _without_on_conflict(monkeypatch)
+    # SQLite's IntegrityError carries no errno, so match that instead of 1062.
+    monkeypatch.setattr(upsert, "MYSQL_DUPLICATE_KEY", None)
+    first, second, inserted = _insert_twice()
+    assert first is not None and second is None
+    assert len(inserted) == 1
+    # Column defaults applied by the INSERT are on the returned row without a refresh.
+    assert inserted[0]["version"] == first["version"] == 1
+    assert _count(Director, imdb_code=DIRECTOR["imdb_code"]) == 1
+
+
+def test_plain_insert_path_raises_other_integrity_errors(monkeypatch):
+    generate(get_engine(), movies=3, mean_cast=1)
+    _without_on_conflict(monkeypatch)
+    with pytest.raises(IntegrityError):
+        _insert_twice()
+
+
+def test_duplicate_post_is_409_and_changes_nothing(client):
+    generate(get_engine(), movies=3, mean_cast=1)
+    assert client.post("/movies/", json=MOVIE).status_code == 201
+    stats = client.get("/stats/years/1998").get_json()
+
+    response = client.post("/movies/", json=MOVIE)
+    assert response.status_code == 409
+    assert "error" in response.get_json()
+    assert client.get("/stats/years/1998").get_json() == stats
+    assert _count(Movie, imdb_code=MOVIE["imdb_code"]) == 1